@@ -31,18 +31,21 @@ from ezpyzy.select import select
 from ezpyzy.send_email import send_email as email
 from ezpyzy.settings import settings, Settings
 from ezpyzy.short_uuid import short_uuid as uuid
+from ezpyzy.short_uuid import short_uuids as uuids
 from ezpyzy.shush import shush
 from ezpyzy.singleton import Singleton, SingletonMeta
 from ezpyzy.sort import sort
 from ezpyzy.subproc import subproc
 from ezpyzy.timer import Timer
 
-from ezpyzy.table import Table, Column, IDColumn
+from ezpyzy.table import Table, Column, IDColumn, CategoryColumn
+from ezpyzy.partitions import Partitions
 ColStr = T.Union[Column[str], str, None]
 ColInt = T.Union[Column[int], int, None]
 ColBool = T.Union[Column[bool], bool, None]
 ColFloat = T.Union[Column[float], float, None]
 ColObj = T.Union[Column[T.Any], T.Any, None]
+ColCat = T.Union[CategoryColumn[str], str, None]
 ColID = T.Union[IDColumn[str], str, None]
 
 import dataclasses
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import ezpyzy as ez
+import pathlib as pl
+import collections as cl
+import itertools as it
+import operator as op
+import typing as T
+
+from ezpyzy.table import Table, Column, ListColumn, ezt_header, column_base_type_map
+
+
+T1 = T.TypeVar('T1', bound=Table)
+
+
+partition_rows = 1 << 20 # rows per chunk file when partitioning a table
+partial_reducers = {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max', 'first': 'first', 'last': 'last', 'list': 'sum'}
+partial_mergers = {
+    'sum': op.add, 'min': min, 'max': max, 'first': lambda a, b: a, 'last': lambda a, b: b
+}
+
+class Partitions(T.Generic[T1]):
+
+    def __init__(self, path:ez.filelike, table_type:type[T1]=None, columns:T.Collection[str]=None, resident=2):
+        self.path = ez.File(path).path
+        self.table_type = table_type or Table
+        self.columns = None if columns is None else list(columns)
+        self.resident = resident
+        self._resident: cl.OrderedDict[pl.Path, T1] = cl.OrderedDict()
+        self._sizes: dict[pl.Path, int] = {}
+
+    @classmethod
+    def of(cls, path:ez.filelike, *datas:T.Union[T1, T.Iterable[T1]], table_type:type[T1]=None, rows=None, resident=2):
+        rows = rows or partition_rows
+        partitions = cls(path, table_type, resident=resident)
+        partitions.path.mkdir(parents=True, exist_ok=True)
+        assert not any(partitions.path.iterdir()), \
+            f'Cannot write partitioned table into non-empty directory {partitions.path}'
+        for data in datas:
+            for table in ([data] if isinstance(data, Table) else data):
+                if partitions.table_type is Table:
+                    partitions.table_type = type(table)
+                for i in range(0, len(table), rows):
+                    partitions.append(table[i:i+rows] if len(table) > rows else table)
+        return partitions
+
+    @property
+    def files(self) -> list[pl.Path]:
+        return sorted(file for file in self.path.glob('*.ezt') if file.stem.isdigit())
+
+    def append(self, table:T1):
+        files = self.files
+        file = self.path / f'{int(files[-1].stem) + 1 if files else 0:06d}.ezt'
+        table().save(file)
+        self._sizes[file] = len(table)
+        return self
+
+    def chunk(self, file:pl.Path) -> T1:
+        if file in self._resident:
+            self._resident.move_to_end(file)
+            return self._resident[file]
+        table = self.table_type.of(file, columns=self.columns)
+        self._resident[file] = table
+        while len(self._resident) > self.resident:
+            self._resident.popitem(last=False)
+        return table
+
+    def chunks(self) -> T.Iterator[T1]:
+        for file in self.files:
+            yield self.chunk(file)
+
+    def sizes(self) -> list[int]:
+        sizes = []
+        for file in self.files:
+            if file not in self._sizes:
+                with open(file, 'rb') as stream:
+                    self._sizes[file] = ezt_header(stream)['rows']
+            sizes.append(self._sizes[file])
+        return sizes
+
+    def __len__(self):
+        return sum(self.sizes())
+
+    def __iter__(self) -> T.Iterator[T1]:
+        for chunk in self.chunks():
+            yield from chunk
+
+    def __getitem__(self, selects) -> T.Union[T1, 'Partitions[T1]']:
+        if isinstance(selects, str):
+            selects = (selects,)
+        if isinstance(selects, tuple):
+            names = [select.name if isinstance(select, Column) else select for select in selects]
+            return Partitions(self.path, self.table_type, names, self.resident)
+        elif callable(selects):
+            return self.select(selects)
+        elif isinstance(selects, int):
+            length = len(self)
+            if not -length <= selects < length:
+                raise IndexError(f'Index {selects} out of range for partitioned table of length {length}')
+            selects = selects + length if selects < 0 else selects
+            selects = slice(selects, selects+1)
+        assert isinstance(selects, slice) and selects.step in (None, 1), \
+            f'Invalid selection {selects} of partitioned table, expected an int, contiguous slice, column names, or function'
+        start, stop, _ = selects.indices(len(self))
+        selected, offset = [], 0
+        for file, size in zip(self.files, self.sizes()):
+            if offset < stop and start < offset + size:
+                selected.append(self.chunk(file)[max(start - offset, 0):stop - offset])
+            offset += size
+        return self.table_type.of(*selected) if selected else self.table_type.of({})
+
+    def _collect(self, results:T.Iterable[T1], out:ez.filelike=None):
+        if out is not None:
+            return Partitions.of(out, results, resident=self.resident)
+        results = list(results)
+        return type(results[0]).of(*results) if results else self.table_type.of({})
+
+    def select(self, selection:T.Callable[[T1], T.Any], out:ez.filelike=None) -> T.Union[T1, 'Partitions[T1]']:
+        return self._collect((chunk[selection(chunk)] for chunk in self.chunks()), out)
+
+    def apply(self, fn, out:ez.filelike=None, name=None, processes=1):
+        results = (chunk().apply(fn, processes=processes) for chunk in self.chunks())
+        if out is not None:
+            def tables():
+                for result in results:
+                    if isinstance(result, Column):
+                        result.name = name or result.name
+                        result = result.table()
+                    if result is not None:
+                        yield result
+            return self._collect(tables(), out)
+        results = [result for result in results if result is not None]
+        if results and all(isinstance(result, Column) for result in results):
+            return column_base_type_map(results[0])(items=it.chain(*results))
+        return self._collect(results)
+
+    def join(self, other:Table, on:str|tuple[str, str], how='inner', out:ez.filelike=None):
+        assert how in ('inner', 'left'), f'Partitioned joins support how="inner" or "left", got {how!r}'
+        left, right = (on, on) if isinstance(on, str) else on
+        return self._collect((
+            chunk[chunk().column_names[left]]().join(other().column_names[right], how) for chunk in self.chunks()
+        ), out)
+
+    def group(self, key:str, **aggregations) -> T.Union[T.Dict[T.Any, T1], T1]:
+        if not aggregations:
+            groups = {}
+            for chunk in self.chunks():
+                for value, rows in chunk().group(chunk().column_names[key]).items():
+                    groups.setdefault(value, []).append(rows)
+            return {value: self.table_type.of(*rows) for value, rows in groups.items()}
+        partials, finals = {}, {}
+        for name, aggregation in aggregations.items():
+            column, reducer = aggregation if isinstance(aggregation, tuple) else (None, aggregation)
+            column = column.name if isinstance(column, Column) else column
+            if reducer == 'mean':
+                partials[f'{name}.sum'], partials[f'{name}.count'] = (column, 'sum'), (column, 'count')
+            else:
+                partials[name] = (column, reducer if reducer in partial_reducers else 'list')
+            finals[name] = reducer
+        merged, types = {}, {}
+        for chunk in self.chunks():
+            result = chunk().group(chunk().column_names[key], **{
+                name: (column, reducer) if column else reducer for name, (column, reducer) in partials.items()
+            })
+            types = types or {column.name: column_base_type_map(column) for column in result()}
+            for k, *values in zip(*result()):
+                if k in merged:
+                    merged[k] = [
+                        partial_mergers[partial_reducers[reducer]](a, b)
+                        for a, b, (_, reducer) in zip(merged[k], values, partials.values())
+                    ]
+                else:
+                    merged[k] = values
+        columns = dict(zip([key, *partials], zip(*[(k, *values) for k, values in merged.items()])))
+        result = self.table_type.of({})
+        result._set_attr(key, types.get(key, ListColumn)(items=columns.get(key, ()), name=key))
+        for name, reducer in finals.items():
+            if reducer == 'mean':
+                values = [s / n if n else None for s, n in zip(columns.get(f'{name}.sum', ()), columns.get(f'{name}.count', ()))]
+                column = Column(items=values, name=name)
+            elif callable(reducer):
+                column = Column(items=[reducer(values) for values in columns.get(name, ())], name=name)
+            else:
+                column = types.get(name, ListColumn)(items=columns.get(name, ()), name=name)
+            result._set_attr(name, column)
+        return result
+
+    def __repr__(self):
+        return f'<{self.table_type.__name__} Partitions: {len(self.files)} chunks in {self.path}>'
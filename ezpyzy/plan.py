@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import inspect as ins
+
+from ezpyzy.table import Table, ListColumn, column_base_type_map
+
+
+def parameters(fn):
+    return list(ins.signature(fn).parameters)
+
+class Plan:
+
+    def __init__(self, op, inputs=(), **args):
+        self.op = op
+        self.inputs: list[Plan] = list(inputs)
+        self.args = args
+
+    @property
+    def columns(self) -> list[str]:
+        if self.op == 'scan':
+            names = list(self.args['table']().column_names)
+            return [name for name in names if name in self.args['columns']] if 'columns' in self.args else names
+        elif self.op == 'select':
+            return list(self.args['names'])
+        elif self.op == 'apply':
+            names = self.inputs[0].columns
+            return names + [name for _, name in self.args['fns'] if name not in names]
+        elif self.op == 'join':
+            left, right, _, right_on = self._sides()
+            cut = set(left.columns) | set(right_on)
+            return left.columns + [name for name in right.columns if name not in cut]
+        return self.inputs[0].columns
+
+    def _sides(self):
+        left, right = self.inputs
+        if self.args['how'] == 'right': # right joins run as left joins from the right table
+            return right, left, self.args['right_on'], self.args['left_on']
+        return left, right, self.args['left_on'], self.args['right_on']
+
+    def _check(self, names, op):
+        missing = [name for name in names if name not in self.columns]
+        assert not missing, f'Lazy {op} uses columns {missing} that are not in {self.columns}'
+
+    def filter(self, predicate) -> 'Plan':
+        self._check(parameters(predicate), 'filter')
+        return Plan('filter', [self], predicate=predicate)
+
+    def select(self, *names) -> 'Plan':
+        self._check(names, 'select')
+        return Plan('select', [self], names=names)
+
+    def apply(self, fn, name=None) -> 'Plan':
+        self._check(parameters(fn), 'apply')
+        return Plan('apply', [self], fns=[(fn, name or fn.__name__)])
+
+    def sort(self, *names, reverse=False) -> 'Plan':
+        self._check(names, 'sort')
+        return Plan('sort', [self], names=names, reverse=reverse)
+
+    def join(self, other, on, how='inner') -> 'Plan':
+        other = other if isinstance(other, Plan) else other().lazy()
+        on = [on] if isinstance(on, (str, tuple)) else on
+        left_on, right_on = zip(*[(key, key) if isinstance(key, str) else key for key in on])
+        assert how in ('inner', 'left', 'right', 'full'), f'Invalid join type {how}'
+        self._check(left_on, 'join')
+        other._check(right_on, 'join')
+        return Plan('join', [self, other], left_on=left_on, right_on=right_on, how=how)
+
+    def optimized(self) -> 'Plan':
+        return fuse_applies(push_filters(self)).pruned(set(self.columns))
+
+    def collect(self) -> Table:
+        return self.optimized().execute()
+
+    def explain(self) -> str:
+        return self.optimized().describe()
+
+    def describe(self, indent=0) -> str:
+        call = lambda fn: f'{getattr(fn, "__name__", fn)}({", ".join(parameters(fn))})'
+        line = {
+            'scan': lambda: f'scan {self.args["table"]().name} [{", ".join(self.columns)}]',
+            'filter': lambda: f'filter {call(self.args["predicate"])}',
+            'select': lambda: f'select [{", ".join(self.columns)}]',
+            'apply': lambda: f'apply {", ".join(f"{name}={call(fn)}" for fn, name in self.args["fns"])}',
+            'sort': lambda: f'sort {", ".join(self.args["names"])}{" reverse" if self.args["reverse"] else ""}',
+            'join': lambda: f'{self.args["how"]} join on ' + ', '.join(
+                f'{l} = {r}' for l, r in zip(self.args['left_on'], self.args['right_on'])),
+        }[self.op]()
+        return '\n'.join(['  ' * indent + line] + [plan.describe(indent + 1) for plan in self.inputs])
+
+    def __str__(self):
+        return self.describe()
+
+    def pruned(self, required) -> 'Plan':
+        if self.op == 'scan':
+            columns = [name for name in self.columns if name in required]
+            return self if columns == self.columns else Plan('scan', table=self.args['table'], columns=columns)
+        elif self.op == 'select':
+            names = [name for name in self.args['names'] if name in required]
+            return Plan('select', [self.inputs[0].pruned(set(names))], names=names)
+        elif self.op == 'filter':
+            needed = required | set(parameters(self.args['predicate']))
+            return Plan('filter', [self.inputs[0].pruned(needed)], **self.args)
+        elif self.op == 'sort':
+            return Plan('sort', [self.inputs[0].pruned(required | set(self.args['names']))], **self.args)
+        elif self.op == 'apply':
+            fns, needed, inputs = [], set(required), set(self.inputs[0].columns)
+            for fn, name in reversed(self.args['fns']): # drop applies whose results are never used
+                if name in needed:
+                    fns.insert(0, (fn, name))
+                    if name not in inputs: # an overwritten column is still read to keep its place
+                        needed.discard(name)
+                    needed.update(parameters(fn))
+            child = self.inputs[0].pruned(needed)
+            return Plan('apply', [child], fns=fns) if fns else child
+        else:
+            left, right, left_on, right_on = self._sides()
+            right_only = set(self.columns) - set(left.columns)
+            inputs = [left.pruned(required & set(left.columns) | set(left_on)),
+                right.pruned(required & right_only | set(right_on))]
+            return Plan('join', inputs[::-1] if self.args['how'] == 'right' else inputs, **self.args)
+
+    def execute(self) -> Table:
+        if self.op == 'scan':
+            table = self.args['table']
+            if 'columns' not in self.args:
+                return table
+            return table[tuple(table._columns[name] for name in self.args['columns'])]
+        elif self.op == 'join':
+            left, right, left_on, right_on = self._sides()
+            left, right = left.execute(), right.execute()
+            left_keys = left[tuple(left._columns[name] for name in left_on)]
+            right_keys = right[tuple(right._columns[name] for name in right_on)]
+            keep = {id(column) for column in [*left(), *right()]} # only the pruned columns are gathered
+            return left_keys._join(right_keys, 'left' if self.args['how'] == 'right' else self.args['how'], keep=keep)
+        table = self.inputs[0].execute()
+        if self.op == 'filter':
+            predicate = self.args['predicate']
+            selection = predicate(*[table._columns[name] for name in parameters(predicate)])
+            return table[list(selection) if isinstance(selection, ListColumn) else selection]
+        elif self.op == 'select':
+            return table[tuple(table._columns[name] for name in self.args['names'])]
+        elif self.op == 'sort':
+            keys = table[tuple(table._columns[name] for name in self.args['names'])]
+            return table[table().sort_order(keys, self.args['reverse'])]
+        else:
+            fns = [(fn, name, parameters(fn)) for fn, name in self.args['fns']]
+            inputs = [name for name in table().column_names if any(name in params for _, _, params in fns)]
+            results = {name: [] for _, name, _ in fns}
+            for values in zip(*[table._columns[name] for name in inputs]): # one fused pass over the rows
+                row = dict(zip(inputs, values))
+                for fn, name, params in fns:
+                    row[name] = result = fn(*[row[param] for param in params])
+                    results[name].append(result)
+            if not inputs:
+                for fn, name, params in fns:
+                    results[name] = [fn() for _ in range(len(table))]
+            added = {name: values for name, values in results.items() if name not in table._columns}
+            result = table - added if added else ~table
+            for name, values in results.items(): # results named after an existing column overwrite it
+                if name not in added:
+                    result._set_attr(name, column_base_type_map(result._columns[name])(items=values, name=name))
+            return result
+
+
+def push_filters(plan):
+    inputs = [push_filters(child) for child in plan.inputs]
+    if plan.op == 'filter':
+        return pushed_filter(plan.args['predicate'], inputs[0])
+    return Plan(plan.op, inputs, **plan.args)
+
+def pushed_filter(predicate, plan):
+    needed = set(parameters(predicate))
+    if plan.op in ('filter', 'select', 'sort'):
+        return Plan(plan.op, [pushed_filter(predicate, plan.inputs[0])], **plan.args)
+    elif plan.op == 'apply' and not needed & {name for _, name in plan.args['fns']}:
+        return Plan(plan.op, [pushed_filter(predicate, plan.inputs[0])], **plan.args)
+    elif plan.op == 'join':
+        left, right = plan.inputs
+        how = plan.args['how']
+        if how in ('inner', 'left') and needed <= set(left.columns):
+            return Plan('join', [pushed_filter(predicate, left), right], **plan.args)
+        right_columns = set(right.columns) if how == 'right' else set(plan.columns) - set(left.columns)
+        if how in ('inner', 'right') and needed <= right_columns:
+            return Plan('join', [left, pushed_filter(predicate, right)], **plan.args)
+    return Plan('filter', [plan], predicate=predicate)
+
+def fuse_applies(plan):
+    inputs = [fuse_applies(child) for child in plan.inputs]
+    if plan.op == 'apply' and inputs[0].op == 'apply':
+        return Plan('apply', inputs[0].inputs, fns=inputs[0].args['fns'] + plan.args['fns'])
+    return Plan(plan.op, inputs, **plan.args)
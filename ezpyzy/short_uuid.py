@@ -8,6 +8,8 @@ A rule of thumb is to only use this (12-char uuid) when the number of uuids you
 
 import uuid
 import sys
+import os
+import functools as ft
 
 alphabet = '23456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz_'
 length = 12
@@ -31,6 +33,25 @@ def short_uuid(length=length):
     """Generate a UUID from a number."""
     return encode(uuid.uuid4().int)[:length]
 
+@ft.lru_cache(maxsize=None)
+def byte_translation(alphabet):
+    """Table mapping random bytes to alphabet characters, and the bytes to drop so every character is equally likely."""
+    base = len(alphabet)
+    unbiased = base * (256 // base)
+    return bytes(ord(alphabet[i % base]) for i in range(256)), bytes(range(unbiased, 256))
+
+def short_uuids(n, length=length, alphabet=alphabet):
+    """Generate n UUIDs at once, drawing each character uniformly from the alphabet using OS randomness."""
+    if n <= 0:
+        return []
+    to_chars, dropped = byte_translation(alphabet)
+    chars = bytearray()
+    while len(chars) < n * length:
+        needed = n * length - len(chars)
+        chars += os.urandom(needed * 256 // (256 - len(dropped)) + 64).translate(to_chars, dropped)
+    chars = chars.decode()
+    return [chars[i:i+length] for i in range(0, n * length, length)]
+
 
 if __name__ == '__main__':
     x = short_uuid()
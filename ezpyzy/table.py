@@ -15,17 +15,33 @@ import pathlib as pl
 import io
 import csv
 import textwrap as tw
+import reprlib as rp
 import inspect as ins
 import sys
 import weakref as wr
 import itertools as it
+import collections as cl
+import functools as ft
+import bisect as bs
+import heapq as hq
+import math
+import operator as op
+import array as ar
+import mmap
+import pickle
+import struct
 import typing as T
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 default = object()
 
 
-def column_type_map(tabletype):
+def column_type_map(tabletype) -> dict[str, tuple[type, type]]:
     if not isinstance(tabletype, type):
         tabletype = type(tabletype)
         for x in tabletype.__mro__:
@@ -34,10 +50,39 @@ def column_type_map(tabletype):
                 break
         else:
             raise TypeError(f'Object {tabletype} is not a Table subclass or instance')
+    return table_schema(tabletype).column_types
+
+class Schema:
+
+    def __init__(self, tabletype):
+        self.column_types = compile_column_types(tabletype)
+        self.column_classes = {name: coltype for name, (coltype, _) in self.column_types.items()}
+        self.element_types = {name: element_type for name, (_, element_type) in self.column_types.items()}
+        self.id_column = next((name for name, coltype in self.column_classes.items() if issubclass(coltype, DictColumn)), None)
+
+table_schemas: wr.WeakKeyDictionary[type, Schema] = wr.WeakKeyDictionary()
+
+def table_schema(tabletype) -> Schema:
+    schema = table_schemas.get(tabletype)
+    if schema is None:
+        schema = table_schemas[tabletype] = Schema(tabletype)
+    return schema
+
+def column_aliases(table) -> dict[int, list[str]]:
+    aliases = {}
+    for name, column in table._columns.items():
+        aliases.setdefault(id(column), []).append(name[0] if isinstance(name, tuple) else name)
+    return aliases
+
+def compile_column_types(tabletype):
+    try:
+        hints = T.get_type_hints(tabletype)
+    except (NameError, TypeError): # annotations that can't be resolved are read as they are written
+        hints = {}
     column_types = {} # name: (type, element type)
     for field in dc.fields(tabletype):
         backup_element_type = str
-        coltype = field.type
+        coltype = hints.get(field.name, field.type)
         origin = T.get_origin(coltype)
         typeargs = T.get_args(coltype)
         while origin and Column not in getattr(origin, '__mro__', ()):
@@ -50,17 +95,662 @@ def column_type_map(tabletype):
                 origin = T.get_origin(coltype)
                 typeargs = T.get_args(coltype)
         if Column in getattr(origin, '__mro__', ()):
-            column_types[field.name] = (
-                origin, typeargs[0] if typeargs else backup_element_type
-            )
+            element_type = typeargs[0] if typeargs else backup_element_type
+            if origin is Column and element_type in array_column_types:
+                origin = array_column_types[element_type]
+            elif np is None and issubclass(origin, ArrayColumn): # e.g. categorical columns are plain lists without numpy
+                origin = Column
+            column_types[field.name] = (origin, element_type)
     return column_types
 
 def column_base_type_map(column):
     if isinstance(column, (DictColumn, DictColumnView)):
         return DictColumn
+    elif isinstance(column, ArrayColumn):
+        return type(column)
+    elif isinstance(column, ArrayColumnView):
+        return type(column._column)
     else:
         return ListColumn
 
+def dict_columns(rows, names=(), chunk_size=2**16):
+    columns, rows, size = {}, iter(rows), 0
+    while chunk := list(it.islice(rows, chunk_size)):
+        names_in_chunk = set().union(*chunk)
+        if not names_in_chunk.issubset(columns): # new names are added in the order rows first mention them
+            for name in dict.fromkeys(it.chain.from_iterable(chunk)):
+                if name not in columns:
+                    columns[name] = [None] * size
+        for name, column in columns.items():
+            column.extend(map(dict.get, chunk, it.repeat(name)))
+        size += len(chunk)
+    for name in names:
+        if name not in columns:
+            columns[name] = [None] * size
+    return columns
+
+def concat_values(columns):
+    if np is not None and len(columns) > 1 and all(isinstance(c, (ArrayColumn, ArrayColumnView)) for c in columns):
+        return np.concatenate([as_array(c) for c in columns])
+    return columns[0] if len(columns) == 1 else list(it.chain.from_iterable(columns))
+
+def hash_join(lkeys, rkeys, lsize, rsize, how='inner'): # -> left rows, right rows (-1 where a side has no row)
+    lkeys = lkeys[0] if len(lkeys) == 1 else zip(*lkeys)
+    rkeys = rkeys[0] if len(rkeys) == 1 else zip(*rkeys)
+    build_left = lsize < rsize
+    build, probe = (list(lkeys), rkeys) if build_left else (list(rkeys), lkeys)
+    first = {}
+    chain = ar.array('q', [-1]) * len(build)
+    for i in range(len(build)-1, -1, -1):
+        key = build[i]
+        chain[i] = first.get(key, -1)
+        first[key] = i
+    del build
+    keep_unmatched_builds = how == 'full' or how == 'left' and build_left
+    keep_unmatched_probes = how == 'full' or how == 'left' and not build_left
+    matched = bytearray(len(chain)) if keep_unmatched_builds else None
+    built, probed = ar.array('q'), ar.array('q')
+    for j, key in enumerate(probe):
+        i = first.get(key, -1)
+        if i == -1 and keep_unmatched_probes:
+            built.append(-1)
+            probed.append(j)
+        while i != -1:
+            built.append(i)
+            probed.append(j)
+            if matched is not None:
+                matched[i] = 1
+            i = chain[i]
+    if keep_unmatched_builds:
+        unmatched = ar.array('q', (i for i, m in enumerate(matched) if not m))
+        built.extend(unmatched)
+        probed.extend(ar.array('q', [-1]) * len(unmatched))
+    if build_left:
+        return sort_by(built, probed)
+    else:
+        return probed, built
+
+def merge_join(lkeys, rkeys, how='inner'):
+    if len(lkeys) == 1 and len(rkeys) == 1:
+        larray, rarray = column_array(lkeys[0]), column_array(rkeys[0])
+        if larray is not None and rarray is not None:
+            return merge_join_arrays(larray, rarray, how)
+    lkeys = lkeys[0] if len(lkeys) == 1 else zip(*lkeys)
+    rkeys = enumerate(ascending(rkeys[0] if len(rkeys) == 1 else zip(*rkeys)))
+    lindices, rindices, right_only = ar.array('q'), ar.array('q'), ar.array('q')
+    done = object()
+    j, rkey = next(rkeys, (0, done))
+    run_key, run_start, run_end = done, 0, 0
+    for i, key in enumerate(ascending(lkeys)):
+        if run_key is done or key != run_key:
+            while rkey is not done and rkey < key:
+                if how == 'full':
+                    right_only.append(j)
+                j, rkey = next(rkeys, (j + 1, done))
+            run_key, run_start = key, j
+            while rkey is not done and rkey == key:
+                j, rkey = next(rkeys, (j + 1, done))
+            run_end = j
+        if run_end > run_start:
+            lindices.extend(ar.array('q', [i]) * (run_end - run_start))
+            rindices.extend(range(run_start, run_end))
+        elif how != 'inner':
+            lindices.append(i)
+            rindices.append(-1)
+    if how == 'full':
+        while rkey is not done:
+            right_only.append(j)
+            j, rkey = next(rkeys, (j + 1, done))
+        lindices.extend(ar.array('q', [-1]) * len(right_only))
+        rindices.extend(right_only)
+    return lindices, rindices
+
+def merge_join_arrays(larray, rarray, how='inner'):
+    for array in (larray, rarray):
+        assert not len(array) or (array[:-1] <= array[1:]).all(), \
+            f'Merge join requires join keys sorted in ascending order'
+    starts = np.searchsorted(rarray, larray, 'left')
+    counts = np.searchsorted(rarray, larray, 'right') - starts
+    if how != 'inner':
+        counts = np.maximum(counts, 1)
+    lindices = np.repeat(np.arange(len(larray)), counts)
+    offsets = np.arange(len(lindices)) - np.repeat(np.cumsum(counts) - counts, counts)
+    rindices = np.repeat(starts, counts) + offsets
+    if how != 'inner':
+        rindices[rindices >= len(rarray)] = -1
+        found = np.flatnonzero(rindices >= 0)
+        rindices[found[rarray[rindices[found]] != larray[lindices[found]]]] = -1
+    if how == 'full':
+        right_only = np.flatnonzero(
+            np.searchsorted(larray, rarray, 'left') == np.searchsorted(larray, rarray, 'right'))
+        lindices = np.concatenate((lindices, np.full(len(right_only), -1)))
+        rindices = np.concatenate((rindices, right_only))
+    return lindices, rindices
+
+def ascending(keys):
+    keys = iter(keys)
+    previous = next(keys, default)
+    if previous is default:
+        return
+    yield previous
+    for key in keys:
+        assert previous <= key, \
+            f'Merge join requires join keys sorted in ascending order, but got {previous!r} before {key!r}'
+        yield key
+        previous = key
+
+def column_version(column):
+    if isinstance(column, ColumnView):
+        return column._version, column._column._version
+    return column._version
+
+def group_codes(keys): # -> group code of each row, first row of each group
+    array = column_array(keys)
+    if array is None and is_categorical(keys):
+        array = category_codes(keys)[0]
+    if array is not None:
+        _, firsts, codes = np.unique(array, return_index=True, return_inverse=True)
+        order = np.argsort(firsts, kind='stable')
+        ranks = np.empty_like(order)
+        ranks[order] = np.arange(len(order))
+        return ranks[codes.reshape(-1)], firsts[order]
+    groups = {}
+    codes, firsts = ar.array('q'), ar.array('q')
+    for i, key in enumerate(keys):
+        code = groups.setdefault(key, len(groups))
+        if code == len(firsts):
+            firsts.append(i)
+        codes.append(code)
+    return codes, firsts
+
+aggregation_reducers = {'count', 'sum', 'mean', 'min', 'max', 'first', 'last', 'list'}
+
+def aggregate(column, codes, firsts, reducer, name=None):
+    size = len(firsts)
+    if reducer == 'count' and np is not None:
+        return array_column(np.bincount(np.asarray(codes, dtype=np.intp), minlength=size), name=name)
+    if reducer == 'first':
+        return gather(column, firsts, name=name)
+    if reducer == 'last':
+        if np is not None:
+            lasts = np.zeros(size, dtype=np.intp)
+            np.maximum.at(lasts, np.asarray(codes, dtype=np.intp), np.arange(len(codes)))
+        else:
+            lasts = ar.array('q', firsts)
+            for i, code in enumerate(codes):
+                lasts[code] = i
+        return gather(column, lasts, name=name)
+    array = column_array(column)
+    if array is not None and reducer in ('sum', 'mean', 'min', 'max'):
+        codes = np.asarray(codes, dtype=np.intp)
+        if reducer == 'mean':
+            sums = np.bincount(codes, weights=array, minlength=size)
+            return array_column(sums / np.bincount(codes, minlength=size), name=name)
+        elif reducer == 'sum' and array.dtype.kind == 'f':
+            return array_column(np.bincount(codes, weights=array, minlength=size), name=name)
+        elif reducer == 'sum':
+            array = array.astype(np.int64) if array.dtype.kind == 'b' else array
+            result = np.zeros(size, dtype=array.dtype)
+            np.add.at(result, codes, array)
+        else:
+            result = array[firsts]
+            (np.minimum if reducer == 'min' else np.maximum).at(result, codes, array)
+        return array_column(result, name=name)
+    codes = codes.tolist() if is_array(codes) else codes
+    if reducer == 'count':
+        counts = [0] * size
+        for code in codes:
+            counts[code] += 1
+        return Column(counts, name=name)
+    elif reducer in ('sum', 'mean', 'min', 'max'):
+        combine = {'sum': op.add, 'mean': op.add, 'min': min, 'max': max}[reducer]
+        results = [default] * size
+        counts = [0] * size
+        for code, value in zip(codes, column):
+            current = results[code]
+            results[code] = value if current is default else combine(current, value)
+            counts[code] += 1
+        if reducer == 'mean':
+            results = [result / count for result, count in zip(results, counts)]
+        return Column(results, name=name)
+    elif reducer == 'list' or callable(reducer):
+        groups = [[] for _ in range(size)]
+        for code, value in zip(codes, column):
+            groups[code].append(value)
+        if callable(reducer):
+            groups = [reducer(group) for group in groups]
+        return ListColumn(groups, name=name)
+    raise ValueError(f'Invalid aggregation {reducer!r}, expected a callable or one of {aggregation_reducers}')
+
+def index_join(lkeys, rindex, rsize, how='inner'):
+    rows = rindex.sync()._rows
+    matched = bytearray(rsize) if how == 'full' else None
+    lindices, rindices = ar.array('q'), ar.array('q')
+    for i, key in enumerate(lkeys):
+        matches = rows.get(key)
+        if matches:
+            lindices.extend(ar.array('q', [i]) * len(matches))
+            rindices.extend(matches)
+            if matched is not None:
+                for j in matches:
+                    matched[j] = 1
+        elif how != 'inner':
+            lindices.append(i)
+            rindices.append(-1)
+    if how == 'full':
+        unmatched = ar.array('q', (j for j, m in enumerate(matched) if not m))
+        lindices.extend(ar.array('q', [-1]) * len(unmatched))
+        rindices.extend(unmatched)
+    return lindices, rindices
+
+def key_matches(lkeys, rkeys, rindex=None):
+    lkeys, rkeys = shared_category_codes(lkeys, rkeys)
+    if len(lkeys) == 1:
+        larray, rarray = column_array(lkeys[0]), column_array(rkeys[0])
+        if larray is not None and rarray is not None:
+            return np.isin(larray, rarray)
+    if rindex is not None:
+        keys = rindex.sync()._rows
+    else:
+        keys = set(rkeys[0] if len(rkeys) == 1 else zip(*rkeys))
+    return list(map(keys.__contains__, lkeys[0] if len(lkeys) == 1 else zip(*lkeys)))
+
+def first_rows(keys):
+    array = column_array(keys)
+    if array is None and is_categorical(keys):
+        array = category_codes(keys)[0]
+    if array is not None:
+        return np.sort(np.unique(array, return_index=True)[1])
+    keys = list(keys)
+    return sorted(dict(zip(reversed(keys), range(len(keys) - 1, -1, -1))).values())
+
+def sort_by(keys, values):
+    if np is not None:
+        keys, values = np.asarray(keys), np.asarray(values)
+        order = np.argsort(keys.view(np.uint64), kind='stable')
+        return keys[order], values[order]
+    order = sorted(range(len(keys)), key=lambda i: (keys[i] < 0, keys[i]))
+    return ar.array('q', (keys[i] for i in order)), ar.array('q', (values[i] for i in order))
+
+class Index:
+
+    def __init__(self, column, kind='hash'):
+        assert kind in ('hash', 'sorted'), f'Invalid index kind {kind!r}, expected "hash" or "sorted"'
+        self.column = column
+        self.kind = kind
+        self._version = None
+        self._rows: dict[T.Any, list[int]]|None = None
+        self._keys = None
+        self._order = None
+
+    @property
+    def is_synced(self):
+        return self._version == column_version(self.column)
+
+    def sync(self):
+        if not self.is_synced:
+            if self.kind == 'hash':
+                self._rows = {}
+                self._append(0)
+            else:
+                array = column_array(self.column)
+                if array is not None: # NaN keys match no comparison, so they are left out of the order
+                    order = np.argsort(array, kind='stable')
+                    self._order = order[:len(order) - int(np.isnan(array).sum())] if array.dtype.kind == 'f' else order
+                    self._keys = array[self._order]
+                else:
+                    values = list(self.column)
+                    self._order = sorted((i for i, value in enumerate(values) if value == value), key=values.__getitem__)
+                    self._keys = [values[i] for i in self._order]
+            self._version = column_version(self.column)
+        return self
+
+    def _append(self, start):
+        rows = self._rows
+        values = self.column[start:] if start else self.column
+        for i, value in enumerate(values.tolist() if is_array(values) else values, start):
+            try:
+                rows[value].append(i)
+            except KeyError:
+                rows[value] = [i]
+
+    def _extended(self, start):
+        if self.kind == 'hash':
+            self._append(start)
+            self._version = column_version(self.column)
+
+    def rows(self, operation, value):
+        if value != value:
+            return None if operation is op.ne else []
+        try:
+            self.sync()
+            if self.kind == 'hash':
+                if operation is op.eq:
+                    return self._rows.get(value, [])
+                return None
+            elif operation is op.ne:
+                return None
+            elif is_array(self._keys):
+                lo, hi = np.searchsorted(self._keys, value, 'left'), np.searchsorted(self._keys, value, 'right')
+            else:
+                lo, hi = bs.bisect_left(self._keys, value), bs.bisect_right(self._keys, value)
+        except TypeError:
+            return None
+        start, stop = {
+            op.eq: (lo, hi), op.lt: (0, lo), op.le: (0, hi), op.gt: (hi, None), op.ge: (lo, None)
+        }[operation]
+        return self._order[start:stop]
+
+    @property
+    def nbytes(self):
+        self.sync()
+        if self.kind == 'hash':
+            return sys.getsizeof(self._rows) + sum(sys.getsizeof(rows) for rows in self._rows.values())
+        return sum(x.nbytes if is_array(x) else sys.getsizeof(x) for x in (self._keys, self._order))
+
+    def __repr__(self):
+        return f'<{self.kind} Index on {self.column.name}>'
+
+def synced_indexes(column):
+    return [index for index in column._indexes.values() if index.is_synced]
+
+def row_mask(rows, size):
+    if np is not None:
+        mask = np.zeros(size, dtype=bool)
+        mask[np.asarray(rows, dtype=np.intp)] = True
+        return array_column(mask)
+    mask = [False] * size
+    for row in rows:
+        mask[row] = True
+    return Column(mask)
+
+def gather(column, indices, name=None):
+    encoded = category_codes(column)
+    if encoded is not None:
+        (codes, base), indices = encoded, np.asarray(indices, dtype=np.intp)
+        categories, missing = list(base.categories), indices < 0
+        codes = codes[indices] if len(codes) else np.zeros(len(indices), dtype=np.int32)
+        if missing.any():
+            if None not in base._code_of:
+                categories.append(None)
+            codes[missing] = base._code_of.get(None, len(base.categories))
+        return category_column(codes, categories, name=name)
+    if isinstance(column, (ArrayColumn, ArrayColumnView)):
+        data = column._data if isinstance(column, ArrayColumn) else column._take(slice(None))
+        indices = np.asarray(indices, dtype=np.intp)
+        missing = indices < 0
+        if not missing.any():
+            return array_column(data[indices], name=name)
+        values = np.empty(len(indices), dtype=object)
+        if len(data):
+            values[:] = data[np.where(missing, 0, indices)].astype(object)
+        values[missing] = None
+        return array_column(values, name=name)
+    values = list(column)
+    values.append(None)
+    return ListColumn([values[i] for i in indices], name=name)
+
+
+def decode_str_cell(cell):
+    if len(cell) > 1 and cell[0] == '"' == cell[-1] and '\\' not in cell:
+        return cell[1:-1]
+    return json.loads(cell)
+
+csv_cell_parsers = {int: int, float: float, bool: {'true': True, 'false': False}.__getitem__, str: decode_str_cell}
+
+def decode_csv_cells(cells, element_type):
+    parse = csv_cell_parsers.get(element_type)
+    if parse is None:
+        return list(map(json.loads, cells))
+    try:
+        return list(map(parse, cells))
+    except (ValueError, KeyError):
+        return [decode_csv_cell(cell, parse) for cell in cells]
+
+def decode_category_cells(cells, element_type):
+    distinct = list(dict.fromkeys(cells))
+    decoded = dict(zip(distinct, decode_csv_cells(distinct, element_type)))
+    return list(map(decoded.__getitem__, cells))
+
+def decode_csv_cell(cell, parse):
+    try:
+        return parse(cell)
+    except (ValueError, KeyError):
+        return json.loads(cell)
+
+csv_chunk_size = 1 << 14
+
+def read_csv_columns(data, column_types, columns=None, chunk_size=None):
+    chunk_size = chunk_size or csv_chunk_size
+    stream = None
+    if isinstance(data, str) and not pl.Path(data).exists():
+        rows = csv.reader(io.StringIO(data))
+    elif isinstance(data, io.TextIOBase) and data.readable():
+        rows = csv.reader(data)
+    elif ez.File(data).format is ez.CSV:
+        stream = open(ez.File(data).path, newline='')
+        rows = csv.reader(stream)
+    else:
+        rows = iter(ez.File(data).load())
+    try:
+        header = next(rows, None)
+        if header is None:
+            return {}
+        keep = [columns is None or name in columns for name in header]
+        header = [name for name, kept in zip(header, keep) if kept]
+        rows = (list(it.compress(row, keep)) for row in rows) if columns is not None else rows
+        element_types = [column_types.get(name, (None, None))[1] for name in header]
+        decoders = [
+            decode_category_cells if issubclass(column_types.get(name, (Column,))[0], CategoryColumn) else decode_csv_cells
+            for name in header]
+        dtypes = [
+            None if decode is decode_category_cells else getattr(column_types.get(name, (None,))[0], 'dtype', None)
+            for name, decode in zip(header, decoders)]
+        buffers = [[] for _ in header]
+        while True:
+            chunk = list(it.islice(rows, chunk_size))
+            if not chunk:
+                break
+            for buffer, decode, element_type, dtype, cells in zip(buffers, decoders, element_types, dtypes, zip(*chunk)):
+                values = decode(cells, element_type)
+                if dtype is not None:
+                    buffer.append(as_array(values, dtype))
+                else:
+                    buffer.extend(values)
+    finally:
+        if stream is not None:
+            stream.close()
+    columns = {}
+    for name, buffer, dtype in zip(header, buffers, dtypes):
+        if dtype is not None:
+            buffer = np.concatenate(buffer) if buffer else np.empty(0, dtype=dtype)
+        columns[name] = buffer
+    return columns
+
+
+def encode_int_cell(value):
+    if type(value) is not int:
+        raise TypeError(f'Expected int, got {type(value)}')
+    return str(value)
+
+def encode_float_cell(value):
+    if type(value) is not float or not -math.inf < value < math.inf:
+        raise TypeError(f'Expected finite float, got {value!r}')
+    return repr(value)
+
+csv_cell_encoders = {int: encode_int_cell, float: encode_float_cell, str: json.encoder.encode_basestring_ascii}
+
+def encode_csv_cells(values, element_type):
+    if is_array(values):
+        if values.dtype.kind in 'iu':
+            return list(map(str, values.tolist()))
+        elif values.dtype.kind == 'b':
+            return ['true' if value else 'false' for value in values.tolist()]
+        elif values.dtype.kind == 'f' and np.isfinite(values).all():
+            return list(map(repr, values.tolist()))
+        values = values.tolist()
+    encode = csv_cell_encoders.get(element_type)
+    if encode is not None:
+        try:
+            return list(map(encode, values))
+        except TypeError:
+            pass
+    return list(map(json.dumps, values))
+
+def column_chunks(column, size):
+    if isinstance(column, (ArrayColumn, ArrayColumnView)):
+        for i in range(0, len(column), size):
+            yield column._take(slice(i, i+size))
+    else:
+        iterator = iter(column)
+        for _ in range(0, len(column), size):
+            yield list(it.islice(iterator, size))
+
+def write_csv_columns(stream, columns, element_types, json_cells=True, chunk_size=None):
+    chunk_size = chunk_size or csv_chunk_size
+    writer = csv.writer(stream)
+    writer.writerow([column.name for column in columns])
+    cell_chunks = [csv_cell_chunks(column, element_type, chunk_size, json_cells)
+        for column, element_type in zip(columns, element_types)]
+    for cells in zip(*cell_chunks):
+        writer.writerows(zip(*cells))
+
+def csv_cell_chunks(column, element_type, size, json_cells=True):
+    encoded = category_codes(column)
+    if encoded is not None:
+        codes, base = encoded
+        cells = encode_csv_cells(base.categories, element_type) if json_cells else base.categories
+        for i in range(0, len(codes), size):
+            yield list(map(cells.__getitem__, codes[i:i+size].tolist()))
+    else:
+        for chunk in column_chunks(column, size):
+            if json_cells:
+                yield encode_csv_cells(chunk, element_type)
+            else:
+                yield chunk.tolist() if is_array(chunk) else chunk
+
+
+ezt_magic = b'EZT1'
+ezt_alignment = 64
+ezt_typecodes = {'<i8': 'q', '<i4': 'i', '<f8': 'd', '|b1': 'b'} # array module fallback when numpy is missing
+
+def is_ezt_file(data):
+    if isinstance(data, io.IOBase):
+        return not isinstance(data, io.TextIOBase) and str(getattr(data, 'name', '')).endswith('.ezt')
+    return str(data.path if isinstance(data, ez.File) else data).endswith('.ezt')
+
+def write_ezt(stream, table, chunk_size=None):
+    chunk_size = chunk_size or csv_chunk_size
+    stream.write(ezt_magic + struct.pack('<Q', 0))
+    header = dict(table=table().name, rows=len(table), columns=[])
+    for column in table():
+        stream.write(b'\0' * (-stream.tell() % ezt_alignment))
+        start = stream.tell()
+        entry = dict(name=column.name, id=isinstance(column, DictColumn), offset=start)
+        array = column_array(column) if isinstance(column, (ArrayColumn, ArrayColumnView)) else None
+        encoded = category_codes(column)
+        if encoded is not None and all(isinstance(value, (str, type(None))) for value in encoded[1].categories):
+            codes, base = encoded
+            entry.update(encoding='category', dtype=codes.dtype.str, categories=base.categories)
+            stream.write(np.ascontiguousarray(codes).tobytes())
+        elif array is not None:
+            entry.update(encoding='array', dtype=array.dtype.str)
+            for chunk in column_chunks(column, chunk_size):
+                stream.write(np.ascontiguousarray(chunk).tobytes())
+        else:
+            try:
+                for i, chunk in enumerate(column_chunks(column, chunk_size)):
+                    chunk = chunk.tolist() if is_array(chunk) else chunk
+                    stream.write((',' if i else '').encode() + json.dumps(chunk)[1:-1].encode())
+                entry.update(encoding='json')
+            except (TypeError, ValueError):
+                stream.seek(start)
+                stream.truncate()
+                pickle.dump(list(column), stream)
+                entry.update(encoding='pickle')
+        entry.update(size=stream.tell() - start)
+        header['columns'].append(entry)
+    header_offset = stream.tell()
+    stream.write(json.dumps(header).encode())
+    stream.seek(len(ezt_magic))
+    stream.write(struct.pack('<Q', header_offset))
+    stream.seek(0, io.SEEK_END)
+
+def ezt_header(stream):
+    prefix = stream.read(len(ezt_magic) + 8)
+    assert prefix[:len(ezt_magic)] == ezt_magic, f'Not an ezt file: {stream}'
+    header_offset, = struct.unpack('<Q', prefix[len(ezt_magic):])
+    stream.seek(header_offset)
+    return json.loads(stream.read())
+
+def read_ezt(stream, table_type=None, columns=None):
+    table_type = table_type or Table
+    header = ezt_header(stream)
+    entries = {entry['name']: entry for entry in header['columns']}
+    if columns is not None:
+        assert all(name in entries for name in columns), \
+            f'Columns {[name for name in columns if name not in entries]} not in ezt file columns {list(entries)}'
+        entries = {name: entries[name] for name in columns}
+    buffer = None
+    if np is not None and any(entry['encoding'] in ('array', 'category') for entry in entries.values()):
+        try:
+            buffer = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (AttributeError, OSError, io.UnsupportedOperation):
+            stream.seek(0)
+            buffer = bytearray(stream.read())
+    table = table_type.of({})
+    if table_type is Table:
+        table().name = header['table']
+    column_types = column_type_map(table_type)
+    for name, entry in entries.items():
+        column_type = column_types.get(name, (DictColumn if entry['id'] else None, None))[0]
+        if entry['encoding'] in ('array', 'category') and buffer is not None:
+            count = entry['size'] // np.dtype(entry['dtype']).itemsize
+            values = np.frombuffer(buffer, dtype=entry['dtype'], count=count, offset=entry['offset'])
+            if entry['encoding'] == 'category':
+                if column_type is None or issubclass(column_type, CategoryColumn):
+                    table._set_attr(name, category_column(values, entry['categories'], name=name))
+                    continue
+                values = list(map(entry['categories'].__getitem__, values.tolist()))
+        else:
+            stream.seek(entry['offset'])
+            block = stream.read(entry['size'])
+            if entry['encoding'] in ('array', 'category'):
+                values = ar.array(ezt_typecodes[entry['dtype']], block).tolist()
+                values = [bool(value) for value in values] if entry['dtype'] == '|b1' else values
+                if entry['encoding'] == 'category':
+                    values = list(map(entry['categories'].__getitem__, values))
+            elif entry['encoding'] == 'json':
+                values = json.loads(b'[' + block + b']')
+            else:
+                values = pickle.loads(block)
+        if is_array(values) and column_type is None:
+            column = array_column(values, name=name)
+        elif is_array(values) and issubclass(column_type, ArrayColumn) and not issubclass(column_type, CategoryColumn) and (
+            column_type.dtype is None or values.dtype == np.dtype(column_type.dtype)
+        ):
+            column = column_type(name=name)
+            column._buffer, column._size = values, len(values)
+        else:
+            column = (column_type or ListColumn)(items=values, name=name)
+        table._set_attr(name, column)
+    return table
+
+
+class EZT(ez.Savable):
+
+    extensions = ['ezt']
+    is_binary = True
+
+    @classmethod
+    def deserialize(cls, string, table_type=None, columns=None):
+        return read_ezt(io.BytesIO(string), table_type, columns)
+
+    def serialize(self: ..., chunk_size=None):
+        stream = io.BytesIO()
+        write_ezt(stream, self, chunk_size)
+        return stream.getvalue()
+
 
 T1 = T.TypeVar('T1', bound='Table')
 
@@ -76,12 +766,17 @@ class Table:
         self._right_joined: Table|None = None
         self._columns: dict[str|tuple[[str]], Column] = {}
         self._path:pl.Path|None = None
-        column_types = {k: v[0] for k, v in column_type_map(self).items()}
-        assert len({len(column) for column in vars(self).values() if isinstance(column, Column)}) <= 1, \
+        self._sorted_by: tuple[list[Column], list]|None = None
+        self._sort_order: tuple[list[Column], list, bool, T.Sequence[int]]|None = None
+        schema = table_schema(type(self))
+        self._id = schema.id_column
+        column_types = schema.column_classes
+        given = [column for column in vars(self).values() if isinstance(column, Column)]
+        lengths = [len(column) for column in given]
+        assert len(set(lengths)) <= 1, \
             f'Columns must have the same number of rows, but got columns ' \
-            f'{", ".join(column.name for column in vars(self).values() if isinstance(column, Column))} ' \
-            f'with lengths {[len(column) for column in vars(self).values() if isinstance(column, Column)]}'
-        length = max([1] + [len(c) for c in vars(self).values() if isinstance(c, Column)])
+            f'{", ".join(column.name for column in given)} with lengths {lengths}'
+        length = max([1] + lengths)
         for name, column_type in column_types.items():
             if hasattr(self, name):
                 attr = getattr(self, name)
@@ -108,30 +803,29 @@ class Table:
             ez.filelike
         ],
         fill: T.Any = default,
+        columns: T.Collection[str] = None,
     ) -> T1:
         tables = []
         for data in datas:
+            if isinstance(data, (str, pl.Path, io.IOBase, ez.File)) and is_ezt_file(data):
+                if isinstance(data, io.IOBase):
+                    tables.append(read_ezt(data, cls, columns))
+                else:
+                    with open(ez.File(data).path, 'rb') as stream:
+                        tables.append(read_ezt(stream, cls, columns))
+                continue
             table = cls()
-            column_types = column_type_map(table)
+            column_types = table_schema(cls).column_types
             if isinstance(data, (str, pl.Path, io.IOBase, ez.File)):
-                if isinstance(data, str) and not pl.Path(data).exists():
-                    try:
-                        csv_data = ez.CSV.deserialize(data)
-                    except Exception:
-                        csv_data = ez.File(data).load()
-                else:
-                    csv_data = ez.File(data).load()
-                data = {col[0]: col[1:] for col in zip(*csv_data)}
-                for col_name, col_vals in list(data.items()):
-                    col_elements_type = column_types.get(col_name, (None, str))[1]
-                    data[col_name] = [json.loads(val) for val in col_vals]
+                data = read_csv_columns(data, column_types, columns)
             if isinstance(data, Table):
                 for var, val in list(vars(table).items()):
                     if isinstance(val, Column):
                         table._del_column(val)
+                aliases = column_aliases(data)
                 for column in data(): # noqa
-                    col = column_base_type_map(column)(items=column, name=column.name)
-                    for alias in data().aliases(column): # noqa
+                    col = detached(column)
+                    for alias in aliases[id(column)]:
                         table._set_attr(alias, col)
             elif isinstance(data, dict):
                 for var, val in list(vars(table).items()):
@@ -140,11 +834,15 @@ class Table:
                 for name, column_data in data.items():
                     col_type = column_types.get(name, (Column, None))[0]
                     setattr(table, name, col_type(items=column_data, name=name))
-            elif isinstance(data, list):
-                if not data:
+            elif isinstance(data, (list, T.Iterator)):
+                first_row = next(iter(data), default)
+                if first_row is default:
                     del table[0]
                     return table
-                first_row = next(iter(data))
+                if not isinstance(data, list): # rows stream in from an iterator
+                    data = it.chain([first_row], data)
+                    if not isinstance(first_row, dict):
+                        data = list(data)
                 if isinstance(first_row, Table):
                     data = [row().dict() for row in data]
                     first_row = next(iter(data))
@@ -158,19 +856,7 @@ class Table:
                         column = column_type(items=column_data, name=empty_column.name)
                         table._set_attr(column.name, column)
                 elif isinstance(first_row, dict):
-                    columns = {}
-                    for i, row in enumerate(data):
-                        for column in columns.values():
-                            column.append(None)
-                        for name, value in row.items():
-                            try:
-                                columns[name][-1] = value
-                            except KeyError:
-                                columns[name] = [None] * i
-                                columns[name].append(value)
-                    for column in table():
-                        if column.name not in columns:
-                            columns[column.name] = [None] * len(data)
+                    columns = dict_columns(data, table().column_names)
                     for name in table().column_names:
                         delattr(table, name)
                     table._columns.clear()
@@ -183,13 +869,34 @@ class Table:
             else:
                 raise TypeError(f'Invalid data type {type(data)}: {data}')
             tables.append(table)
-        table = tables[0]
-        for other in tables[1:]:
-            table += other
+        table = tables[0]._concat(tables[1:])
         if fill is not default:
             table().fill(fill)
         return table
 
+    @classmethod
+    def concat(cls:type[T1], tables:T.Iterable[T.Union['Table', T.Mapping[str, T.Collection], ez.filelike]]) -> T1:
+        tables = [table if isinstance(table, Table) else cls.of(table) for table in tables]
+        if not tables:
+            return cls.of([])
+        return cls.of(tables[0])._concat(tables[1:])
+
+    def _concat(self, tables):
+        assert all(not isinstance(column, ColumnView) for column in self()), \
+            f'Row concatenation is not supported for views. Columns: {list(self())}'
+        names = [column.name for column in self()]
+        columns = []
+        for table in tables:
+            named = {column.name: column for column in table()}
+            assert len(named) == len(names) and named.keys() == set(names), \
+                f'Row concatenation requires the same column names, but got {list(named)} for columns {names}'
+            assert table._id is None or table._id == self._id, \
+                f'Row concatenation requires the same ID column, but got {table._id} for ID column {self._id}'
+            columns.append([named[name] for name in names])
+        for column, others in zip(self(), zip(*columns)):
+            column._extend(concat_values(others))
+        return self
+
     def _set_attr(self, key, value):
         if isinstance(value, Column) and '_columns' in vars(self):
             if key is None:
@@ -254,13 +961,30 @@ class Table:
         return detached
 
     def __len__(self):
-        columns = list(self())
-        if columns:
-            return len(columns[0])
+        for column in self._columns.values():
+            return len(column)
         return 0
 
     def __iter__(self:T1) -> T.Iterator[T1]:
-        yield from (self[i] for i in range(len(self)))
+        """Writable row views, one table per row. For fast read-only loops use table().rows() instead."""
+        attrs = [(k, v) for k, v in vars(self).items() if not isinstance(v, Column)]
+        columns = self().columns
+        for i in range(len(self)):
+            view = type(self).__new__(type(self))
+            vars(view).update(attrs)
+            view._origin = view
+            view._columns = {}
+            view._meta = Meta(view)
+            view._view_index = [i]
+            column_views = {id(column): ColumnView(column, range(i, i+1)) for column in columns}
+            for key, column in self._columns.items():
+                name = key[0] if isinstance(key, tuple) else key
+                column_view = column_views[id(column)]
+                column_view._origin = view
+                view._columns[name] = column_view
+                if isinstance(name, str):
+                    object.__setattr__(view, name, column_view)
+            yield view
 
     def __contains__(self, item):
         if isinstance(item, Table):
@@ -296,8 +1020,10 @@ class Table:
                 raise TypeError(f'Invalid column type {type(selects[0])} of {selects[0]} in selection {selects}')
         elif isinstance(selects, Column) and selects.name is not None:
             cols = [selects]
+        elif isinstance(selects, (ArrayColumn, ArrayColumnView)) or is_array(selects):
+            rows = as_indices(selects, len(self))
         elif isinstance(selects, slice):
-            rows = list(range(*selects.indices(len(self))))
+            rows = range(*selects.indices(len(self)))
         elif isinstance(selects, DictColumn):
             rows = [dict.__getitem__(self().id._ids, key) for key in selects]
         elif isinstance(selects, list):
@@ -323,19 +1049,21 @@ class Table:
             raise TypeError(f'Invalid index type {type(selects)} of {selects}')
         if rows is not None:
             view._origin = view
+            view._view_index = rows if isinstance(rows, range) or is_array(rows) else list(rows)
+            aliases = column_aliases(self)
             for column in self():
                 column_view = ColumnView(column, rows)
                 setattr(view, column.name, column_view)
-                view._view_index = list(rows)
-                for alias in self().aliases(column):
+                for alias in aliases[id(column)]:
                     setattr(view, alias, column_view)
         elif cols is not None:
             own_columns = {id(column) for column in self()}
             assert all(id(col) in own_columns for col in cols), \
                 f'Attempted selecting columns not belonging to Table {self}: {[c.name for c in cols]}'
+            aliases = column_aliases(self)
             for column in cols:
                 view._set_attr(column.name, column)
-                for alias in self().aliases(column):
+                for alias in aliases[id(column)]:
                     view._set_attr(alias, column)
         return view
 
@@ -414,6 +1142,8 @@ class Table:
                 cols = selects
             else:
                 raise TypeError(f'Invalid column type {type(selects[0])} of {selects[0]} in selection {selects}')
+        elif isinstance(selects, (ArrayColumn, ArrayColumnView)) or is_array(selects):
+            rows = as_indices(selects, len(self))
         elif isinstance(selects, slice):
             rows = list(range(*selects.indices(len(self))))
         elif isinstance(selects, DictColumn):
@@ -467,11 +1197,7 @@ class Table:
             f'Row concatenation is not supported for views. Columns: {list(self())}'
         if not isinstance(other, Table):
             other = self.of(other)
-        assert len(self()) == len(other()), \
-            f'Row concatenation requires equal number of columns, but got column lengths {len(self)} != {len(other)}'
-        for column, values in zip(self(), other()):
-            column._extend(values)
-        return self
+        return self._concat([other])
 
     def __sub__(self: T1, other:T.Union[
             T.Collection[T.Union[T.Collection, T.Mapping, 'Table']],
@@ -501,99 +1227,83 @@ class Table:
             f'Column concatenation requires equal number of rows, but got row lengths {len(self)} != {len(other)}'
         for name, column in other._columns.items():
             if name not in self._columns:
-                self._set_attr(name, Column(column, name=name))
+                self._set_attr(name, detached(column, name=name if isinstance(name, str) else name[0]))
         return self
 
-    def __and__(self: T1, other) -> T1: # inner join
+    def _join(self, other, how, method=None, keep=None):
         if isinstance(other, Column):
             other = other.table()
         assert len(self()) == len(other()), \
-            f"Left join received join key of different lengths: len({list(self())}) != len({list(other())})"
-        ltable = self._origin or self
-        rtable = other._origin or other
+            f"Join received join keys with different numbers of columns: len({list(self())}) != len({list(other())})"
+        ltable = self._origin if self._origin is not None else self
+        rtable = other._origin if other._origin is not None else other
         cut_right_cols = set(ltable().column_names) | set(other().column_names)
-        lkeys = self().items()
-        rkeys = other().items()
-        ldata = ltable().items()
-        rcols = [col for col in rtable() if col.name not in cut_right_cols]
-        rdata = zip(*rcols)
-        rmap = {}
-        for rkey, rrow in zip(rkeys, rdata):
-            if rkey not in rmap:
-                rmap[rkey] = []
-            rmap[rkey].append(rrow)
-        rempty = []
-        result_col_names = [col.name for col in ltable()] + [col.name for col in rcols]
-        result_rows = [
-            lrow + rrow for lkey, lrow in zip(lkeys, ldata) for rrow in rmap.get(lkey, rempty)
-        ]
-        result_cols = zip(*result_rows)
+        rcols = [col for col in rtable() if col.name not in cut_right_cols and (keep is None or id(col) in keep)]
+        if method is None:
+            lsorted, rsorted = ltable().sorted_by, rtable().sorted_by
+            method = 'merge' if (
+                len(self()) <= min(len(lsorted), len(rsorted))
+                and all(a is b for a, b in zip(self(), lsorted))
+                and all(a is b for a, b in zip(other(), rsorted))
+            ) else 'hash'
+        rindex = other().columns[0]._indexes.get('hash') if len(other()) == 1 else None
+        if method == 'merge':
+            lindices, rindices = merge_join(self().columns, other().columns, how)
+        elif method == 'hash' and rindex is not None:
+            lindices, rindices = index_join(self().columns[0], rindex, len(other), how)
+        elif method == 'hash':
+            lkeys, rkeys = shared_category_codes(self().columns, other().columns)
+            lindices, rindices = hash_join(lkeys, rkeys, len(self), len(other), how)
+        else:
+            raise ValueError(f'Invalid join method {method}, expected "hash" or "merge"')
         result = type(ltable).of({})
-        for col_name, col in zip(result_col_names, result_cols):
-            result._set_attr(col_name, Column(col))
+        rkeys = {id(lkey): rkey for lkey, rkey in zip(self(), other())}
+        right_only = [i for i, index in enumerate(lindices) if index < 0] if how == 'full' else []
+        aliases = column_aliases(ltable)
+        for column in ltable():
+            if keep is not None and id(column) not in keep:
+                continue
+            result_column = gather(column, lindices, name=column.name)
+            if right_only and id(column) in rkeys: # full join rows from right only take their key from the right
+                result_column[right_only] = gather(rkeys[id(column)], [rindices[i] for i in right_only])
+            for alias in aliases[id(column)]:
+                result._set_attr(alias, result_column)
+        for column in rcols:
+            result._set_attr(column.name, gather(column, rindices, name=column.name))
         return result
 
-    def __lshift__(self, other): # left join
+    def _filter_join(self, other, anti=False):
         if isinstance(other, Column):
             other = other.table()
         assert len(self()) == len(other()), \
-            f"Left join received join key of different lengths: len({list(self())}) != len({list(other())})"
-        ltable = self._origin or self
-        rtable = other._origin or other
-        cut_right_cols = set(ltable().column_names) | set(other().column_names)
-        lkeys = self().items()
-        rkeys = other().items()
-        ldata = ltable().items()
-        rcols = [col for col in rtable() if col.name not in cut_right_cols]
-        rdata = zip(*rcols)
-        rmap = {}
-        for rkey, rrow in zip(rkeys, rdata):
-            if rkey not in rmap:
-                rmap[rkey] = []
-            rmap[rkey].append(rrow)
-        rempty = [(None,) * len(rcols)]
-        result_col_names = [col.name for col in ltable()] + [col.name for col in rcols]
-        result_rows = [
-            lrow + rrow for lkey, lrow in zip(lkeys, ldata) for rrow in rmap.get(lkey, rempty)
-        ]
-        result_cols = zip(*result_rows)
-        result = type(ltable).of({})
-        for col_name, col in zip(result_col_names, result_cols):
-            result._set_attr(col_name, Column(col))
-        return result
+            f"Join received join keys with different numbers of columns: len({list(self())}) != len({list(other())})"
+        ltable = self._origin if self._origin is not None else self
+        rindex = other().columns[0]._indexes.get('hash') if len(other()) == 1 else None
+        matches = key_matches(self().columns, other().columns, rindex)
+        if is_array(matches):
+            return ltable[np.flatnonzero(~matches if anti else matches)]
+        return ltable[list(it.compress(range(len(matches)), map(op.not_, matches) if anti else matches))]
+
+    def _update(self, result):
+        table = self._origin if self._origin is not None else self
+        for column in table():
+            table._del_column(column)
+        for name, column in result._columns.items():
+            column._origin = None
+            table._set_attr(name, column)
+        table._view_index = None
+        if table._origin is table:
+            table._origin = None
+        return table
+
+    def __and__(self: T1, other) -> T1: # inner join
+        return self._join(other, 'inner')
+
+    def __lshift__(self, other): # left join
+        return self._join(other, 'left')
 
     def __or__(self, other): # full join
-        if isinstance(other, Column):
-            other = other.table()
-        assert len(self()) == len(other()), \
-            f"Left join received join key of different lengths: len({list(self())}) != len({list(other())})"
-        ltable = self._origin or self
-        rtable = other._origin or other
-        cut_right_cols = set(ltable().column_names) | set(other().column_names)
-        lkeys = list(self().items())
-        rkeys = other().items()
-        ldata = ltable().items()
-        rcols = [col for col in rtable() if col.name not in cut_right_cols]
-        rdata = zip(*rcols)
-        rmap = {}
-        for rkey, rrow in zip(rkeys, rdata):
-            if rkey not in rmap:
-                rmap[rkey] = []
-            rmap[rkey].append(rrow)
-        lempty = [None] * len(ltable())
-        rempty = [(None,) * len(rcols)]
-        result_col_names = [col.name for col in ltable()] + [col.name for col in rcols]
-        lkeyset = set(lkeys)
-        result_rows = [
-            lrow + rrow for lkey, lrow in zip(lkeys, ldata) for rrow in rmap.get(lkey, rempty)
-        ] + [
-            lempty + rrow for rrow in [rrow for rkey, rrow in rmap.items() if rkey not in lkeyset]
-        ]
-        result_cols = zip(*result_rows)
-        result = type(ltable).of({})
-        for col_name, col in zip(result_col_names, result_cols):
-            result._set_attr(col_name, Column(col))
-        return result
+        return self._join(other, 'full')
 
     def __matmul__(self, other):  # cartesian product
         if isinstance(other, Column):
@@ -601,17 +1311,18 @@ class Table:
         ltable = self
         rtable = other
         cut_right_cols = set(ltable().column_names)
-        ldata = ltable().items()
         rcols = [col for col in rtable() if col.name not in cut_right_cols]
-        rdata = list(zip(*rcols))
-        result_col_names = [col.name for col in ltable()] + [col.name for col in rcols]
-        result_rows = [
-            lrow + rrow for lrow in ldata for rrow in rdata
-        ]
-        result_cols = zip(*result_rows)
+        if np is None:
+            lindices = [i for i in range(len(ltable)) for _ in range(len(rtable))]
+            rindices = list(range(len(rtable))) * len(ltable)
+        else:
+            lindices = np.repeat(np.arange(len(ltable)), len(rtable))
+            rindices = np.tile(np.arange(len(rtable)), len(ltable))
         result = type(ltable).of({})
-        for col_name, col in zip(result_col_names, result_cols):
-            result._set_attr(col_name, Column(col))
+        for column in ltable():
+            result._set_attr(column.name, gather(column, lindices))
+        for column in rcols:
+            result._set_attr(column.name, gather(column, rindices))
         return result
 
     def __rshift__(self, other): # right join
@@ -620,22 +1331,40 @@ class Table:
         return other << self
 
     def __iand__(self: T1, other) -> T1: # inner join
-        raise NotImplementedError('In-place Inner Join not implemented yet')
+        return self._update(self & other)
 
     def __ior__(self: T1, other) -> T1: # outer join
-        raise NotImplementedError('In-place Outer Join not implemented yet')
+        return self._update(self | other)
 
     def __ilshift__(self, other): # left join
-        raise NotImplementedError('In-place Left Join not implemented yet')
+        return self._update(self << other)
 
     def __irshift__(self, other): # right join
-        raise NotImplementedError('In-place Right Join not implemented yet')
+        return self._update(self >> other)
 
 
 
 T2 = T.TypeVar('T2', bound=Table)
 T4 = T.TypeVar('T4', bound='Table')
 
+@ft.lru_cache(maxsize=None)
+def row_type(names):
+    return cl.namedtuple('Row', names, rename=True)
+
+display_num_rows = 20 # rows shown when displaying a table, split between its head and tail
+display_cell_limit = 1000 # characters of a cell formatted for display when no max_cell_width is given
+display_repr = rp.Repr()
+display_repr.maxstring = display_repr.maxother = display_repr.maxlong = display_cell_limit
+display_repr.maxlist = display_repr.maxtuple = display_repr.maxdict = display_repr.maxset = display_cell_limit // 2
+
+def display_cell(value, limit):
+    if isinstance(value, str):
+        return value[:limit + 1]
+    elif isinstance(value, (list, tuple, dict, set, frozenset)):
+        return display_repr.repr(value)[:limit + 1]
+    return str(value)[:limit + 1]
+
+
 class Meta(T.Generic[T2]):
     def __init__(self, table:T2):
         self.table:T2 = table
@@ -645,17 +1374,27 @@ class Meta(T.Generic[T2]):
     @path.setter
     def path(self, path:ez.filelike):
         self.table._path = ez.File(path).path
-    def save(self, path:ez.filelike=None, json_cells=True):
-        col_types = {k: v[1] for k, v in column_type_map(type(self.table)).items()}
-        columns = [[col.name] + [
-            json.dumps(val) if json_cells else val for val in col
-        ] for col in self.columns]
-        rows = zip(*columns)
-        if path is None:
-            return ez.CSV.serialize(rows)
+    def save(self, path:ez.filelike=None, json_cells=True, chunk_size=None):
+        element_types = table_schema(type(self.table)).element_types
+        element_types = [element_types.get(col.name) for col in self.columns]
+        if path is not None and is_ezt_file(path):
+            if isinstance(path, io.IOBase):
+                return write_ezt(path, self.table, chunk_size)
+            path = ez.File(path).path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'wb') as stream:
+                return write_ezt(stream, self.table, chunk_size)
+        elif path is None:
+            stream = io.StringIO()
+            write_csv_columns(stream, self.columns, element_types, json_cells, chunk_size)
+            return stream.getvalue()
+        elif isinstance(path, io.TextIOBase):
+            write_csv_columns(path, self.columns, element_types, json_cells, chunk_size)
         else:
-            file = ez.File(path or self.table._path, format='csv')
-            return file.save(rows)
+            path = ez.File(path).path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, 'w', newline='') as stream:
+                write_csv_columns(stream, self.columns, element_types, json_cells, chunk_size)
     @property
     def origin(self):
         return self.table._origin
@@ -701,15 +1440,14 @@ class Meta(T.Generic[T2]):
     def R(self):
         return self.table._right_joined
     def aliases(self, column:'Column'):
-        return [
-            name[0] if isinstance(name, tuple) else name
-            for name, col in self.table._columns.items()
-            if col is column
-        ]
+        return column_aliases(self.table).get(id(column), [])
     def item(self):
         return [col[0] for col in self.columns]
     def items(self):
         return zip(*self.columns)
+    def rows(self) -> T.Iterator[tuple]:
+        names = tuple(self.column_names)
+        return map(row_type(names)._make, zip(*self.columns))
     def dict(self):
         return {name: col[0] for name, col in self.column_names.items()}
     def dicts(self):
@@ -734,13 +1472,21 @@ class Meta(T.Generic[T2]):
         else:
             raise TypeError(f'Invalid item type {type(item)} in Table Meta membership check: {item}')
 
-    def display(self, max_cell_width=None, max_row_width=None, max_num_rows=None):
-        columns = [[col.name]+[str(c) for c in col] for col in self.columns]
+    def display(self, max_cell_width=None, max_row_width=None, max_num_rows=display_num_rows):
+        num_rows = len(self.table)
+        if max_num_rows is None or num_rows <= max_num_rows:
+            shown, elided = range(num_rows), None
+        else:
+            head = (max_num_rows + 1) // 2
+            shown, elided = [*range(head), *range(num_rows - max_num_rows + head, num_rows)], head
+        cell_limit = display_cell_limit if max_cell_width is None else max_cell_width
+        columns = [[col.name]+[display_cell(col[i], cell_limit) for i in shown] for col in self.columns]
         max_col_widths = [len(max(col, key=len)) for col in columns]
         if max_cell_width is not None:
             max_col_widths = [min(mcw, max_cell_width) for mcw in max_col_widths]
         rows = list(zip(*columns))
-        rows = rows[:max_num_rows+1] if max_num_rows is not None else rows
+        if elided is not None:
+            rows.insert(elided + 1, tuple('...'[:mcw] for mcw in max_col_widths))
         formatted_rows = [
             f"{self.name} {'Table' if self.name != 'Table' else ''}: {len(self):,} cols x {len(self.table):,} rows"
         ]
@@ -787,11 +1533,21 @@ class Meta(T.Generic[T2]):
 
     def apply(self, fn:callable, processes:int=1):
         sig = ins.signature(fn)
-        if all(param in self.table._columns for param in sig.parameters):
-            columnwise = [self.table._columns[param] for param in sig.parameters]
-            results = [fn(*args) for args in zip(*columnwise)]
+        table = self.table
+        if all(param in table._columns for param in sig.parameters):
+            columnwise = [table._columns[param] for param in sig.parameters]
+            if processes > 1 and len(table) > 1:
+                def apply_batch(batch): # only the argument columns are shipped to workers
+                    return [fn(*args) for args in batch]
+                results = ez.multiprocess(apply_batch, list(zip(*columnwise)), n_processes=processes)
+            else:
+                results = [fn(*args) for args in zip(*columnwise)]
+        elif processes > 1 and len(table) > 1:
+            def apply_batch(batch): # workers fork with the table, so only row indices are shipped
+                return [fn(table[i]) for i in batch]
+            results = ez.multiprocess(apply_batch, range(len(table)), n_processes=processes)
         else:
-            results = [fn(row) for row in self.table]
+            results = [fn(row) for row in table]
         results = [result for result in results if result is not None]
         if all(type(result) is dict for result in results):
             output = Table.of([result for result in results if result is not None])
@@ -799,14 +1555,127 @@ class Meta(T.Generic[T2]):
             output = Column(items=results, name=getattr(fn, '__name__', None))
         return output
 
-    def sort(self, key=None, reverse=False):
+    def sort(self, key=None, reverse=False, k=None): # with k, only the first k rows are sorted, the rest keep their order
+        if k is not None:
+            rows = self._top_rows(k, key, reverse)
+            selected = row_mask(rows, len(self.table))
+            rest = it.compress(range(len(self.table)), map(op.not_, selected))
+            self.reorder(list(rows) + list(rest))
+            self.table._sorted_by = None
+            return self.table
+        key_columns = self._sort_keys(key)
+        order = self._sort_order(key_columns, reverse)
+        in_order = (order == np.arange(len(order))).all() if is_array(order) else order == list(range(len(order)))
+        if not in_order:
+            self.reorder(order)
+        own_columns = {id(column) for column in self.columns}
+        if all(isinstance(column, Column) for column in key_columns) and not reverse \
+            and all(id(column) in own_columns for column in key_columns):
+            self.table._sorted_by = (key_columns, [column_version(column) for column in key_columns])
+        else:
+            self.table._sorted_by = None
+        return self.table
+
+    @property
+    def sorted_by(self) -> list['Column']:
+        if self.table._sorted_by is None:
+            return []
+        own_columns = {id(column) for column in self.columns}
+        sorted_by = []
+        for column, version in zip(*self.table._sorted_by):
+            if id(column) not in own_columns or column_version(column) != version:
+                break
+            sorted_by.append(column)
+        return sorted_by
+
+    def compact(self) -> T2:
+        for column in self.columns:
+            if isinstance(column, (ListColumn, ListColumnView)):
+                column.compact()
+        return self.table
+
+    def add_index(self, column, kind='hash') -> 'Index':
+        column = self.table._columns[column] if isinstance(column, str) else column
+        if kind not in column._indexes:
+            column._indexes[kind] = Index(column, kind)
+        return column._indexes[kind].sync()
+
+    def drop_index(self, column, kind=None):
+        column = self.table._columns[column] if isinstance(column, str) else column
+        for index_kind in ([kind] if kind else list(column._indexes)):
+            column._indexes.pop(index_kind, None)
+        return self.table
+
+    @property
+    def indexes(self) -> list['Index']:
+        return [index for column in self.columns for index in column._indexes.values()]
+
+    def join(self, other, how='inner', method=None) -> T2:
+        if how == 'right':
+            if isinstance(other, Column):
+                other = other.table()
+            return other().join(self.table, 'left', method)
+        return self.table._join(other, how, method)
+
+    def semi_join(self, other) -> T2:
+        return self.table._filter_join(other)
+
+    def anti_join(self, other) -> T2:
+        return self.table._filter_join(other, anti=True)
+
+    def distinct(self, key=None) -> T2:
+        if key is None:
+            key = self.table
+        key_columns = [key] if isinstance(key, Column) else key().columns
+        return self.table[first_rows(key_columns[0] if len(key_columns) == 1 else zip(*key_columns))]
+
+    def topk(self, k, key=None, reverse=False) -> T2:
+        return self.table[self._top_rows(k, key, reverse)]
+
+    def _top_rows(self, k, key, reverse):
+        if key is None:
+            key = self.table
+        if isinstance(key, Table):
+            key = key().columns[0] if len(key()) == 1 else list(zip(*map(category_sort_keys, key())))
+        elif callable(key) and not isinstance(key, Column):
+            sig = ins.signature(key)
+            if all(param in self.table._columns for param in sig.parameters):
+                columnwise = [self.table._columns[param] for param in sig.parameters]
+                key = [key(*args) for args in zip(*columnwise)] # noqa
+            else:
+                key = [key(row) for row in self.table] # noqa
+        if is_categorical(key):
+            ranks = category_ranks(key)
+            key = list(key) if ranks is None else ranks
+        assert len(key) == len(self.table), \
+            f'Key must have same length as table, but got {len(key)} != {len(self.table)}'
+        return top_rows(key, k, reverse)
+
+    def sort_order(self, key=None, reverse=False) -> T.Sequence[int]: # cached until the key columns change
+        return self._sort_order(self._sort_keys(key), reverse)
+
+    def _sort_order(self, keys, reverse):
+        cacheable = all(isinstance(column, Column) for column in keys)
+        versions = [column_version(column) for column in keys] if cacheable else None
+        cached = self.table._sort_order
+        if cacheable and cached is not None and cached[1:3] == (versions, reverse) and len(cached[0]) == len(keys) \
+            and all(a is b for a, b in zip(cached[0], keys)):
+            return cached[3] if is_array(cached[3]) else list(cached[3])
+        order = argsort_rows(keys, reverse)
+        if is_array(order):
+            order.flags.writeable = False # shared with the cache, so callers can't change it
+        if cacheable:
+            self.table._sort_order = (keys, versions, reverse, order)
+        return order if is_array(order) else list(order)
+
+    def _sort_keys(self, key):
         if isinstance(key, Column):
-            key = key.table()
+            return [key]
         if key is None:
             key = self.table
         if isinstance(key, Table):
-            key = list(zip(*key()))
-        if callable(key) and not isinstance(key, (Column, Table)):
+            return key().columns
+        if callable(key):
             sig = ins.signature(key)
             if all(param in self.table._columns for param in sig.parameters):
                 columnwise = [self.table._columns[param] for param in sig.parameters]
@@ -814,31 +1683,50 @@ class Meta(T.Generic[T2]):
             else:
                 key = [key(row) for row in self.table] # noqa
         assert len(key) == len(self.table), \
-            f'Key must have same length as table, but got {len(key)} != {len(self)}'
-        items = sorted(zip(key, range(len(self.table))), reverse=reverse)
-        keys, indices = zip(*items)
-        old_to_new_indices = [None] * len(indices)
-        for i, index in enumerate(indices):
-            old_to_new_indices[index] = i # noqa
+            f'Key must have same length as table, but got {len(key)} != {len(self.table)}'
+        return [key]
+
+    def reorder(self, indices) -> T2:
+        self.compact()
+        positions = indices.tolist() if np is not None and isinstance(indices, np.ndarray) else indices
+        old_to_new_indices = None
         for column in self.columns:
-            if isinstance(column, list):
+            if isinstance(column, ListColumnView):
+                tmp = column._indices
+                column.clear()
+                column._extend(ar.array('q', map(tmp.__getitem__, positions))) # noqa
+            elif isinstance(column, list):
                 tmp = list(list.__iter__(column))
                 column.clear()
-                column._extend([tmp[i] for i in indices]) # noqa
-                if getattr(column, '_views', None):
-                    for view in column._views.values(): # noqa
-                        vtmp = list(list.__iter__(view))
-                        view.clear()
-                        view._extend([old_to_new_indices[i] for i in vtmp])
+                column._extend(list(map(tmp.__getitem__, positions))) # noqa
+                for view in list(column._views.values()): # noqa
+                    if old_to_new_indices is None:
+                        old_to_new_indices = [0] * len(positions)
+                        for i, index in enumerate(positions):
+                            old_to_new_indices[index] = i
+                    vtmp = view._indices
+                    view.clear()
+                    view._extend(ar.array('q', map(old_to_new_indices.__getitem__, vtmp)))
+            elif isinstance(column, (ArrayColumn, ArrayColumnView)):
+                column._permute(indices)
             else:
                 raise NotImplementedError('Sort not implemented for non-list columns')
         return self.table
 
     default = object()
 
-    def group(self, key=None) -> T.Dict[T.Any, T2]:
+    def group(self, key=None, **aggregations) -> T.Dict[T.Any, T2] | T2:
+        if aggregations:
+            return self._aggregate(key, aggregations)
         if key is None:
             key = list(self.items())
+        if isinstance(key, Column) and 'hash' in key._indexes:
+            group_indices = key._indexes['hash'].sync()._rows
+            return {key: self.table[indices] for key, indices in group_indices.items()}
+        if is_categorical(key):
+            codes, firsts = group_codes(key)
+            groups = np.split(np.argsort(codes, kind='stable'), np.cumsum(np.bincount(codes))[:-1])
+            return {key[int(first)]: self.table[indices] for first, indices in zip(firsts, groups)}
         if isinstance(key, Column):
             key = list(key)
         elif isinstance(key, Table):
@@ -856,6 +1744,44 @@ class Meta(T.Generic[T2]):
         groups = {key: self.table[indices] for key, indices in group_indices.items()}
         return groups
 
+    def _aggregate(self, key, aggregations):
+        if key is None:
+            key = self.table
+        if isinstance(key, Column):
+            key_columns = [key]
+        elif isinstance(key, Table):
+            key_columns = key().columns
+            key = key_columns[0] if len(key_columns) == 1 else list(key().items()) # noqa
+        else:
+            if callable(key):
+                sig = ins.signature(key)
+                if all(param in self.table._columns for param in sig.parameters):
+                    columnwise = [self.table._columns[param] for param in sig.parameters]
+                    key = [key(*args) for args in zip(*columnwise)] # noqa
+                else:
+                    key = [key(row) for row in self.table] # noqa
+            key_columns = [ListColumn(key, name='key')]
+        codes, firsts = group_codes(key)
+        result = type(self.table).of({})
+        for column in key_columns:
+            result._set_attr(column.name, gather(column, firsts, name=column.name))
+        for name, aggregation in aggregations.items():
+            column, reducer = aggregation if isinstance(aggregation, tuple) else (None, aggregation)
+            if isinstance(column, str):
+                column = self.table._columns[column]
+            assert column is not None or reducer == 'count', \
+                f'Aggregation {name}={reducer!r} needs a column to aggregate, like {name}=(column, {reducer!r})'
+            result._set_attr(name, aggregate(column, codes, firsts, reducer, name=name))
+        return result
+
+    def lazy(self) -> 'Plan':
+        from ezpyzy.plan import Plan
+        return Plan('scan', table=self.table)
+
+    def partition(self, path:ez.filelike, rows=None, resident=2) -> 'Partitions[T2]':
+        from ezpyzy.partitions import Partitions
+        return Partitions.of(path, self.table, rows=rows, resident=resident)
+
 
 class ColumnOpsTypeHinting:
     def __and__(self, other): pass
@@ -904,25 +1830,25 @@ class ColumnOps(T.Generic[T3]):
     def __iand__(self, other):
         x = self.table()
         x &= other
-        return x
+        return x._columns.get(self.name, x)
     def __or__(self, other):
         return self.table() | other
     def __ior__(self, other):
         x = self.table()
         x |= other
-        return x
+        return x._columns.get(self.name, x)
     def __lshift__(self, other):
         return self.table() << other
     def __ilshift__(self, other):
         x = self.table()
         x <<= other
-        return x
+        return x._columns.get(self.name, x)
     def __rshift__(self, other):
         return self.table() >> other
     def __irshift__(self, other):
         x = self.table()
         x >>= other
-        return x
+        return x._columns.get(self.name, x)
     def __xor__(self, other):
         return self.table() ^ other
     def __ixor__(self, other):
@@ -936,129 +1862,153 @@ class ColumnOps(T.Generic[T3]):
         x @= other
         return x
     # Elementwise
-    def __add__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a + b for a, b in zip(self, other)]
+    def _elementwise(self, other, operation):
+        if self._indexes and operation in comparisons and not isinstance(other, (list, Column, Table)) and not is_array(other):
+            for index in self._indexes.values():
+                rows = index.rows(operation, other)
+                if rows is not None:
+                    return row_mask(rows, len(self))
+        if operation in (op.eq, op.ne) and is_categorical(self) and not isinstance(other, (list, Column, Table)) \
+            and not is_array(other):
+            codes, base = category_codes(self)
+            try:
+                return array_column(operation(codes, base._code_of.get(other, -1)))
+            except TypeError: # unhashable value
+                pass
+        results = vectorized(operation, self, other)
+        if results is not None:
+            return array_column(results)
+        if type(other) is not list and not isinstance(other, Column) and not is_array(other):
+            other = it.repeat(other)
+        results = [operation(a, b) for a, b in zip(self, other)]
         return Column(items=results)
-    def __iadd__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a + b for a, b in zip(self, other)]
+    def _ielementwise(self, other, operation):
+        results = vectorized(operation, self, other)
+        if results is not None:
+            self[:] = results
+            return self
+        if type(other) is not list and not isinstance(other, Column) and not is_array(other):
+            other = it.repeat(other)
+        results = [operation(a, b) for a, b in zip(self, other)]
         for i, result in enumerate(results):
             self[i] = result
         return self
-    def __sub__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a - b for a, b in zip(self, other)]
+    def _unary(self, operation):
+        results = vectorized(operation, self)
+        if results is not None:
+            return array_column(results)
+        results = [operation(a) for a in self]
         return Column(items=results)
+    def __add__(self, other):
+        return self._elementwise(other, op.add)
+    def __iadd__(self, other):
+        return self._ielementwise(other, op.add)
+    def __sub__(self, other):
+        return self._elementwise(other, op.sub)
     def __isub__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a - b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.sub)
     def __mul__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a * b for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.mul)
     def __imul__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a * b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.mul)
     def __truediv__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a / b for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.truediv)
     def __itruediv__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a / b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.truediv)
     def __floordiv__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a // b for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.floordiv)
     def __ifloordiv__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a // b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.floordiv)
     def __mod__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a % b for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.mod)
     def __imod__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a % b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.mod)
     def __pow__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a ** b for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.pow)
     def __ipow__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [a ** b for a, b in zip(self, other)]
-        for i, result in enumerate(results):
-            self[i] = result
-        return self
+        return self._ielementwise(other, op.pow)
     def __lt__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a < b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.lt)
     def __le__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a <= b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.le)
     def __eq__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a == b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.eq)
     def __ne__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a != b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.ne)
     def __gt__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a > b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.gt)
     def __ge__(self, other):
-        if type(other) is not list and not isinstance(other, Column):
-            other = [other] * len(self)
-        results = [(a >= b) for a, b in zip(self, other)]
-        return Column(items=results)
+        return self._elementwise(other, op.ge)
     def __neg__(self):
-        results = [-a for a in self]
-        return Column(items=results)
+        return self._unary(op.neg)
     def __pos__(self):
-        results = [+a for a in self]
-        return Column(items=results)
+        return self._unary(op.pos)
     def __abs__(self):
-        results = [abs(a) for a in self]
-        return Column(items=results)
+        return self._unary(op.abs)
+
+
+comparisons = {op.lt, op.le, op.eq, op.ne, op.gt, op.ge}
+
+def is_array(obj):
+    return np is not None and isinstance(obj, np.ndarray)
+
+def column_array(column):
+    if np is None or is_categorical(column):
+        return None
+    elif isinstance(column, ArrayColumn):
+        array = column._data
+    elif isinstance(column, ArrayColumnView):
+        array = column._take(slice(None))
+    elif isinstance(column, np.ndarray):
+        array = column
+    else:
+        return None
+    return array if array.dtype.kind in array_dtype_kinds else None
+
+def vectorized(operation, column, other=default):
+    array = column_array(column)
+    if array is None:
+        return None
+    if other is default:
+        operands = (array,)
+    elif isinstance(other, (bool, int, float)) or isinstance(other, (np.number, np.bool_)):
+        operands = (array, other)
+    elif isinstance(other, (list, Column, np.ndarray)):
+        other = column_array(other) if isinstance(other, (ArrayColumn, ArrayColumnView)) else as_array(other)
+        if other is None or other.dtype.kind not in array_dtype_kinds:
+            return None
+        operands = (array, other)
+    else:
+        return None
+    if operation not in comparisons:
+        operands = [o.astype(np.int64) if is_array(o) and o.dtype.kind == 'b' else o for o in operands]
+        if int_overflows(operation, operands):
+            return None
+    try:
+        with np.errstate(divide='raise', invalid='raise'):
+            return operation(*operands)
+    except (FloatingPointError, ValueError, TypeError, OverflowError):
+        return None
+
+int_limit = 2**62 # bound on int results that int64 holds without wrapping, with margin for sums of two bounds
+
+def int_bound(operand):
+    if is_array(operand):
+        return max(-int(operand.min()), int(operand.max()), 0) if len(operand) else 0
+    return abs(int(operand))
+
+def int_overflows(operation, operands):
+    if operation is op.truediv or not all(
+        o.dtype.kind in 'iu' if is_array(o) else isinstance(o, (int, np.integer)) for o in operands):
+        return False
+    bounds = [int_bound(o) for o in operands]
+    if len(bounds) == 1 or operation in (op.floordiv, op.mod):
+        return max(bounds) >= int_limit
+    elif operation is op.mul:
+        return bounds[0] * bounds[1] >= int_limit
+    elif operation is op.pow:
+        return bounds[0] > 1 and bounds[1] * bounds[0].bit_length() >= int_limit.bit_length() - 1
+    return bounds[0] + bounds[1] >= int_limit
 
 
 TC = T.TypeVar('TC')
@@ -1067,6 +2017,8 @@ class Column(ColumnOpsTypeHinting, T.Generic[TC]):
     def __new__(_cls, *args, **kwargs):
         if _cls is DictColumn:
             _obj = dict.__new__(_cls)
+        elif issubclass(_cls, ArrayColumn):
+            _obj = object.__new__(_cls)
         else:
             _cls = ListColumn
             _obj = list.__new__(_cls)
@@ -1075,6 +2027,8 @@ class Column(ColumnOpsTypeHinting, T.Generic[TC]):
         self.name:str|None = name
         self._origin = None
         self._views = wr.WeakValueDictionary()
+        self._version = 0 # incremented on every mutation
+        self._indexes: dict[str, Index] = {}
     def __call__(self, new_value=None):
         if new_value is not None:
             self[0] = new_value
@@ -1098,7 +2052,10 @@ class Column(ColumnOpsTypeHinting, T.Generic[TC]):
 
 class ColumnView(Column, T.Generic[TC]):
     def __new__(_cls, _column, *args, **kwargs):
-        if isinstance(_column, DictColumn):
+        if isinstance(_column, (ArrayColumn, ArrayColumnView)):
+            _cls = ArrayColumnView
+            _obj = object.__new__(_cls)
+        elif isinstance(_column, DictColumn):
             _cls = DictColumnView
             _obj = list.__new__(_cls)
         elif isinstance(_column, list):
@@ -1111,19 +2068,94 @@ class ColumnView(Column, T.Generic[TC]):
         self._column = column
         self.name = column.name if name is None else name
         self._origin = None
+        self._version = 0
+        self._indexes: dict[str, Index] = {}
     def __str__(self):
         return f"[{', '.join(self)}]"
     def __repr__(self):
         return f"[{', '.join(repr(e) for e in self)}]"
 
+tombstone_threshold = 0.25 # fraction of a list column's stored rows that can be deleted before it is compacted
+live_bytes = bytes.maketrans(b'\0\1', b'\1\0')
+
 class ListColumn(ColumnOps, list, Column, T.Generic[TC]):
     def __init__(self, items=(), name=None):
         list.__init__(self, items)
         Column.__init__(self, name=name)
+        self._tombstones: bytearray|None = None # marks deleted rows that are still stored
+        self._dead: list[int] = [] # sorted stored positions of deleted rows
+    def __len__(self):
+        return list.__len__(self) - len(self._dead)
+    def __iter__(self):
+        if self._dead:
+            return it.compress(list.__iter__(self), self._tombstones.translate(live_bytes))
+        return list.__iter__(self)
+    def __reversed__(self):
+        return list.__reversed__(self.compact())
+    def __contains__(self, item):
+        return list.__contains__(self.compact(), item)
+    def __repr__(self):
+        return list.__repr__(self.compact())
+    def index(self, value, *bounds):
+        return list.index(self.compact(), value, *bounds)
+    def count(self, value):
+        return list.count(self.compact(), value)
+    def copy(self):
+        return list(self)
+    def append(self, value):
+        self._extend([value])
+    def insert(self, index, value):
+        list.insert(self.compact(), index, value)
+        self._moved()
+    def pop(self, index=-1):
+        value = list.pop(self.compact(), index)
+        self._moved()
+        return value
+    def remove(self, value):
+        list.remove(self.compact(), value)
+        self._moved()
+    def sort(self, *, key=None, reverse=False):
+        list.sort(self.compact(), key=key, reverse=reverse)
+        self._moved()
+    def reverse(self):
+        list.reverse(self.compact())
+        self._moved()
+    def _moved(self):
+        self._version += 1
+    def _physical(self, i):
+        dead, lo, hi = self._dead, 0, len(self._dead)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if dead[mid] - mid <= i:
+                lo = mid + 1
+            else:
+                hi = mid
+        return i + lo
+    def compact(self):
+        if not self._dead:
+            return self
+        live = self._tombstones.translate(live_bytes)
+        positions = ar.array('q', it.accumulate(live, initial=0))
+        list.__setitem__(self, slice(None), list(it.compress(list.__iter__(self), live)))
+        self._tombstones, self._dead = None, []
+        for view in list(self._views.values()):
+            rows = view._indices
+            view.clear()
+            view._extend(ar.array('q', (positions[i] for i in rows if live[i])))
+        return self
     def __getitem__(self, selection):
+        if self._dead:
+            if isinstance(selection, int):
+                length = len(self)
+                if not -length <= selection < length:
+                    raise IndexError(f'Index {selection} out of range for column of length {length}')
+                return list.__getitem__(self, self._physical(selection % length))
+            self.compact()
         try:
             return list.__getitem__(self, selection)
         except TypeError:
+            if isinstance(selection, (ArrayColumn, ArrayColumnView)) or is_array(selection):
+                return [list.__getitem__(self, i) for i in as_indices(selection, len(self)).tolist()]
             if not isinstance(selection, list):
                 raise TypeError(f'Invalid index type {type(selection)} of {selection}')
             if not selection:
@@ -1142,6 +2174,8 @@ class ListColumn(ColumnOps, list, Column, T.Generic[TC]):
             to_delete = {selection}
         elif isinstance(selection, slice):
             to_delete = set(range(*selection.indices(len(self))))
+        elif isinstance(selection, (ArrayColumn, ArrayColumnView)) or is_array(selection):
+            to_delete = set(as_indices(selection, len(self)).tolist())
         elif isinstance(selection, list):
             if not selection:
                 to_delete = set()
@@ -1153,20 +2187,30 @@ class ListColumn(ColumnOps, list, Column, T.Generic[TC]):
                 to_delete = set(selection)
         else:
             raise TypeError(f'Invalid index type {type(selection)} of {selection}')
-        copy = list(self)
-        self.clear()
-        index_map = {}
-        redone_elements = [e for i, e in enumerate(copy) if i not in to_delete]
-        for i, e in [(i, e) for i, e in enumerate(copy) if i not in to_delete]:
-            index_map[i] = len(index_map)
-        self._extend(redone_elements)
-        for view in self._views.values():
-            viewcopy = list(list.__iter__(view))
-            view.clear()
-            view._extend([index_map[index] for index in viewcopy if index in index_map])
+        length = len(self)
+        assert all(-length <= i < length for i in to_delete), \
+            f'Indices in {selection} are beyond the index bounds of {self.name} (len {length}) for deletion'
+        positions = sorted({i % length for i in to_delete})
+        if not positions:
+            return
+        if self._dead:
+            positions = [self._physical(i) for i in positions]
+        if self._tombstones is None:
+            self._tombstones = bytearray(list.__len__(self))
+        for position in positions:
+            self._tombstones[position] = 1
+        if len(positions) == 1:
+            bs.insort(self._dead, positions[0])
+        else:
+            self._dead = sorted(self._dead + positions)
+        self._version += 1
+        if len(self._dead) > tombstone_threshold * list.__len__(self):
+            self.compact()
     def __setitem__(self, selection, values):
         if isinstance(values, Table):
             return
+        self.compact()
+        self._version += 1
         if isinstance(selection, (int, slice)):
             list.__setitem__(self, selection, values)
         elif isinstance(selection, list):
@@ -1182,47 +2226,125 @@ class ListColumn(ColumnOps, list, Column, T.Generic[TC]):
         assert self._origin is None, \
             f'Cannot extend column ({self}) attached to table ({self._origin})'
         self._extend(values)
-    _extend = list.extend
+    def _extend(self, values:T.Iterable[TC]):
+        indexes, start = synced_indexes(self), len(self)
+        list.extend(self, values)
+        if self._tombstones is not None:
+            self._tombstones.extend(bytes(list.__len__(self) - len(self._tombstones)))
+        self._version += 1
+        for index in indexes:
+            index._extended(start)
+    def clear(self):
+        list.clear(self)
+        self._tombstones, self._dead = None, []
+        self._version += 1
+
+
+def compact_indices(indices):
+    if isinstance(indices, (range, ar.array)):
+        return indices
+    if is_array(indices):
+        indices = indices.astype(np.int64, copy=False)
+        if len(indices) > 1 and indices[1] != indices[0] and (np.diff(indices) == indices[1] - indices[0]).all():
+            return range(int(indices[0]), int(indices[-1]) + int(indices[1] - indices[0]), int(indices[1] - indices[0]))
+        packed = ar.array('q')
+        packed.frombytes(indices.tobytes())
+        return packed
+    return ar.array('q', indices)
+
+def range_slice(indices:range):
+    return slice(indices.start, None if indices.stop < 0 else indices.stop, indices.step)
+
+def select_indices(indices, selection):
+    if isinstance(selection, range):
+        return indices[range_slice(selection)] if selection else range(0)
+    if is_array(selection):
+        selection = selection.tolist()
+    return ar.array('q', map(indices.__getitem__, selection))
+
+def take(column, indices):
+    if isinstance(indices, range):
+        return list.__getitem__(column, range_slice(indices)) if indices else []
+    return list(map(ft.partial(list.__getitem__, column), indices))
 
 
 class ListColumnView(ColumnOps, list, ColumnView, T.Generic[TC]):
-    def __init__(self, column:Column, indices:list[int], name=None):
+    def __init__(self, column:Column, indices:T.Iterable[int], name=None):
         if isinstance(column, ColumnView):
-            indices = [list.__getitem__(column, i) for i in indices] # noqa
+            indices = select_indices(column._indices, indices if is_array(indices) else compact_indices(indices))
             column = column._column
-        list.__init__(self, indices)
+        column.compact() # views hold stored positions, which only match row numbers without tombstones
         ColumnView.__init__(self, column, indices, name=name)
+        self._indices = compact_indices(indices)
         self._column._views[id(self)] = self
+    @property
+    def _indices(self) -> range|ar.array:
+        if self._column._dead:
+            self._column.compact()
+        return self._rows
+    @_indices.setter
+    def _indices(self, indices):
+        self._rows = indices
+    def compact(self):
+        self._column.compact()
+        return self
+    def __len__(self):
+        return len(self._indices)
     def __getitem__(self, selection):
-        try:
-            return self._column[list.__getitem__(self, selection)]
-        except TypeError:
-            if not isinstance(selection, list):
-                raise TypeError(f'Invalid index type {type(selection)}')
-            if not selection:
-                return []
-            first = selection[0]
-            if isinstance(first, bool):
-                assert len(selection) == len(self), \
-                    f'Boolean index must have same length as column, but got {len(selection)} != {len(self)}'
-                indices = [i for i, b in zip(list.__iter__(self), selection) if b]
-                return self._column[indices]
-            elif isinstance(first, int):
-                indices = [list.__getitem__(self, i) for i in selection]
-                return self._column[indices]
-            else:
-                raise TypeError(f'Invalid index type {type(first)} of {first}')
-    def __iter__(self):
-        if isinstance(self._column, ColumnView):
-            indices = list(list.__iter__(self))
-            return iter(self._column[indices])
+        if isinstance(selection, int):
+            return list.__getitem__(self._column, self._indices[selection])
+        elif isinstance(selection, slice):
+            return take(self._column, self._indices[selection])
+        if isinstance(selection, (ArrayColumn, ArrayColumnView)) or is_array(selection):
+            indices = select_indices(self._indices, as_indices(selection, len(self)))
+            return take(self._column, indices)
+        if not isinstance(selection, list):
+            raise TypeError(f'Invalid index type {type(selection)}')
+        if not selection:
+            return []
+        first = selection[0]
+        if isinstance(first, bool):
+            assert len(selection) == len(self), \
+                f'Boolean index must have same length as column, but got {len(selection)} != {len(self)}'
+            indices = [i for i, b in zip(self._indices, selection) if b]
+            return take(self._column, indices)
+        elif isinstance(first, int):
+            return take(self._column, select_indices(self._indices, selection))
         else:
-            return iter([list.__getitem__(self._column, i) for i in list.__iter__(self)])
+            raise TypeError(f'Invalid index type {type(first)} of {first}')
+    def __iter__(self):
+        if isinstance(self._indices, range):
+            return iter(take(self._column, self._indices))
+        return map(ft.partial(list.__getitem__, self._column), self._indices)
+    def __reversed__(self):
+        return iter(self[::-1])
+    def __contains__(self, item):
+        return any(value is item or value == item for value in self)
+    def index(self, value, *bounds):
+        return list(self).index(value, *bounds)
+    def count(self, value):
+        return list(self).count(value)
+    def copy(self):
+        return list(self)
+    def append(self, value):
+        raise TypeError(f'Column of type {type(self)} does not support append: {self}')
+    def insert(self, index, value):
+        raise TypeError(f'Column of type {type(self)} does not support insert: {self}')
+    def pop(self, index=-1):
+        raise TypeError(f'Column of type {type(self)} does not support pop: {self}')
+    def remove(self, value):
+        raise TypeError(f'Column of type {type(self)} does not support remove: {self}')
+    def sort(self, *, key=None, reverse=False):
+        raise TypeError(f'Column of type {type(self)} does not support sort: {self}')
+    def reverse(self):
+        raise TypeError(f'Column of type {type(self)} does not support reverse: {self}')
     def __delitem__(self, selection):
         if isinstance(selection, int):
             to_delete = {selection}
         elif isinstance(selection, slice):
             to_delete = set(range(*selection.indices(len(self))))
+        elif isinstance(selection, (ArrayColumn, ArrayColumnView)) or is_array(selection):
+            to_delete = set(as_indices(selection, len(self)).tolist())
         elif isinstance(selection, list):
             if not selection:
                 to_delete = set()
@@ -1236,59 +2358,92 @@ class ListColumnView(ColumnOps, list, ColumnView, T.Generic[TC]):
             raise TypeError(f'Invalid index type {type(selection)} of {selection}')
         assert all(-len(self) <= i < len(self) for i in to_delete), \
             f'Indices in {selection} are beyond the index bounds of of {self} (len {len(self)}) for deletion'
-        copy = [item for i, item in enumerate(list.__iter__(self)) if i not in to_delete]
+        copy = ar.array('q', (index for i, index in enumerate(self._indices) if i not in to_delete))
         self.clear()
         self._extend(copy)
     def clear(self):
-        list.clear(self)
+        self._indices = range(0)
+        self._version += 1
     def __setitem__(self, selection, values):
         if isinstance(values, Table):
             return
-        if isinstance(selection, (int, slice)):
-            self._column[list.__getitem__(self, selection)] = values
+        if isinstance(selection, int):
+            self._column[self._indices[selection]] = values
+        elif isinstance(selection, slice):
+            self._column[list(self._indices[selection])] = values
         elif isinstance(selection, list):
             if selection and isinstance(selection[0], bool):
                 selection = [i for i, b in enumerate(selection) if b]
             assert len(selection) == len(values), \
                 f'Number of values ({len(values)}) does not match number of indices ({len(selection)})'
-            self._column[[list.__getitem__(self, i) for i in selection]] = values
+            self._column[[self._indices[i] for i in selection]] = values
         else:
             raise TypeError(f'Invalid index type {type(selection)} of {selection}')
     def extend(self, values:T.Iterable[TC]):
         raise TypeError(f'Column of type {type(self)} does not support extend: {self}')
     def _extend(self, indices):
-        list.extend(self, indices)
+        if not self._indices:
+            self._indices = compact_indices(indices)
+        else:
+            self._indices = ar.array('q', self._indices)
+            self._indices.extend(compact_indices(indices))
+        self._version += 1
     def __str__(self):
         return f"[{', '.join(self)}]"
     def __repr__(self):
         return f"[{', '.join(repr(e) for e in self)}]"
 
 
+def with_ids(values):
+    values = list(values)
+    missing = [i for i, value in enumerate(values) if value is None]
+    for i, value in zip(missing, ez.uuids(len(missing))):
+        values[i] = value
+    return values
+
 class DictColumn(ListColumn[TC]):
     def __init__(self, items=(), name=None):
         ListColumn.__init__(self, (), name=name)
-        self._ids = {}
+        self._id_rows = {}
         self._extend(items)
+    @property
+    def _ids(self):
+        if self._dead:
+            self.compact()
+        return self._id_rows
+    def __contains__(self, item):
+        return item in self._ids
+    def compact(self):
+        if self._dead:
+            ListColumn.compact(self)
+            self._id_rows = {value: i for i, value in enumerate(list.__iter__(self))}
+        return self
+    def _moved(self):
+        self._id_rows = {value: i for i, value in enumerate(list.__iter__(self))}
+        self._version += 1
+    def insert(self, index, value):
+        raise AssertionError("Inserting into IDColumn is not allowed!")
     def clear(self):
-        self._ids.clear()
+        self._id_rows.clear()
         ListColumn.clear(self)
     def extend(self, values:T.Iterable[TC]):
         assert self._origin is None, \
             f'Cannot extend column ({self}) attached to table ({self._origin})'
         self._extend(values)
     def _extend(self, values:T.Iterable[TC]):
-        values = [str(ez.uuid()) if value is None else value for value in values]
-        extended_len = len(self) + len(values)
-        union = set(self._ids) | set(values)
-        assert len(union) == extended_len, \
-            f'Cannot extend ID column with duplicate values in: {set(values)}'
-        self._ids.update({value: i for i, value in enumerate(values)})
+        values = with_ids(values)
+        ids, start = self._ids, list.__len__(self)
+        new_ids = dict(zip(values, range(start, start + len(values))))
+        assert len(new_ids) == len(values) and ids.keys().isdisjoint(new_ids.keys()), \
+            f'Cannot extend ID column with duplicate values in: {[v for v in values if v in ids or values.count(v) > 1]}'
+        ids.update(new_ids)
         ListColumn._extend(self, values)
     def append(self, value):
         raise AssertionError("Appending to IDColumn is not allowed!")
     def __setitem__(self, selection, values):
         if isinstance(values, Table):
             return
+        self._version += 1
         if isinstance(selection, int):
             if values is None:
                 values = str(ez.uuid())
@@ -1298,7 +2453,7 @@ class DictColumn(ListColumn[TC]):
             list.__setitem__(self, selection, values)
             self._ids[values] = selection
         else:
-            values = [str(ez.uuid()) if value is None else value for value in values]
+            values = with_ids(values)
             assert len(set(values)) == len(values), \
                 f'Cannot set ID column with duplicate values in: {values}'
             remaining = set(self._ids) - set(values)
@@ -1326,30 +2481,483 @@ class DictColumnView(ListColumnView[TC], DictColumn):
     def __init__(self, column:Column, indices:list[int], name=None):
         assert isinstance(column, DictColumn), \
             f'Cannot create DictColumnView from non-DictColumn: {column}'
-        if isinstance(column, ColumnView):
-            indices = [list.__getitem__(column, i) for i in indices] # noqa
-            column = column._column
-        self._ids = {key: i for i, key in enumerate(column)}
+        self._id_index = None
         ListColumnView.__init__(self, column, indices, name=name)
+    @property
+    def _ids(self):
+        if self._id_index is None:
+            self._id_index = {key: j for j, key in enumerate(take(self._column, self._indices))}
+        return self._id_index
     def _origin_index(self, key): # noqa
-        return list.__getitem__(self, self._ids[key])
+        return self._indices[self._ids[key]]
     def clear(self):
-        self._ids.clear()
+        self._id_index = None
         ListColumnView.clear(self)
     def _extend(self, indices):
-        extended_len = len(self) + len(indices)
-        union = set(self._ids.values()) | set(indices)
-        assert len(union) == extended_len, \
-            f'Cannot extend ID column view with duplicate view indices: {set(self._ids) & set(indices)}'
-        old_len = len(self)
-        self._ids.update({self._column[index]: i for i, index in enumerate(indices, old_len)})
-        list.extend(self, indices)
+        self._id_index = None
+        ListColumnView._extend(self, indices)
     def __str__(self):
         return f"[{', '.join(self)}]"
     def __repr__(self):
         return f"[{', '.join(repr(e) for e in self)}]"
 
 
+array_dtype_kinds = {'i': 'iu', 'u': 'iu', 'f': 'fiu', 'b': 'b'} # buffer dtype kind: compatible value kinds
+array_chunk_size = 1 << 16
+
+def as_array(items, dtype=None):
+    if isinstance(items, ArrayColumn):
+        array = items._data
+    elif isinstance(items, ArrayColumnView):
+        array = items._take(slice(None))
+    elif isinstance(items, np.ndarray):
+        array = items
+    else:
+        if not isinstance(items, T.Sized):
+            items = list(items)
+        try:
+            array = np.array(items) if len(items) else np.array(items, dtype=dtype or object)
+        except (ValueError, TypeError, OverflowError):
+            array = None
+        if array is None or array.ndim != 1 or array.dtype.kind not in array_dtype_kinds:
+            array = np.empty(len(items), dtype=object)
+            array[:] = list(items)
+            return array
+    if dtype is not None and np.dtype(dtype).kind != 'O':
+        if array.dtype.kind in array_dtype_kinds.get(np.dtype(dtype).kind, ''):
+            return array.astype(dtype, copy=False)
+        return array.astype(object)
+    return array
+
+def promoted(buffer, size, dtype):
+    if buffer.dtype.kind in 'iu' and dtype.kind == 'f' and (not size or np.abs(buffer[:size]).max() <= 2**53):
+        return buffer.astype(np.float64)
+    return buffer if buffer.dtype.kind == 'O' else buffer.astype(object)
+
+def as_indices(selection, length):
+    if isinstance(selection, slice):
+        return np.arange(*selection.indices(length))
+    if isinstance(selection, (ArrayColumn, ArrayColumnView)):
+        selection = selection._take(slice(None))
+    selection = np.asarray(selection)
+    if selection.dtype.kind == 'b':
+        assert len(selection) == length, \
+            f'Boolean index must have same length as column, but got {len(selection)} != {length}'
+        return np.flatnonzero(selection)
+    elif selection.dtype.kind in 'iu' or not len(selection):
+        return selection.astype(np.intp, copy=False)
+    else:
+        raise TypeError(f'Invalid index type {selection.dtype} of {selection}')
+
+
+class ArrayColumn(ColumnOps, Column, T.Generic[TC]):
+    dtype = None
+    def __init__(self, items=(), name=None):
+        Column.__init__(self, name=name)
+        self._buffer = as_array(items, self.dtype).copy()
+        self._size = len(self._buffer)
+        self._shared: list[int]|None = None # [number of columns sharing the buffer], set by detached
+        self._release: wr.finalize|None = None # leaves the share, run early by _own or when the column is collected
+    def _own(self, copy=True):
+        if self._shared is not None:
+            self._release()
+            if self._shared[0] and copy:
+                self._buffer = self._buffer[:self._size].copy()
+            self._shared = self._release = None
+    @property
+    def _data(self):
+        return self._buffer[:self._size]
+    def __array__(self, dtype=None, copy=None):
+        data = self._data.view()
+        data.flags.writeable = False
+        return data if dtype is None else data.astype(dtype)
+    def __len__(self):
+        return self._size
+    def __iter__(self):
+        data = self._data
+        for i in range(0, len(data), array_chunk_size):
+            yield from data[i:i+array_chunk_size].tolist()
+    def __contains__(self, item):
+        return any(item == e for e in self)
+    def __getitem__(self, selection):
+        if isinstance(selection, (int, np.integer)):
+            item = self._data[selection]
+            return item if self._buffer.dtype.kind == 'O' else item.item()
+        return self._take(selection).tolist()
+    def _take(self, selection):
+        if isinstance(selection, slice):
+            return self._data[selection]
+        return self._data[as_indices(selection, self._size)]
+    def __setitem__(self, selection, values):
+        if isinstance(values, Table):
+            return
+        if not isinstance(selection, (int, np.integer, slice)):
+            selection = as_indices(selection, self._size)
+            assert len(selection) == len(values), \
+                f'Number of values ({len(values)}) does not match number of indices ({len(selection)})'
+        self._version += 1
+        self._own()
+        if self._buffer.dtype.kind != 'O':
+            value_array = as_array([values] if isinstance(selection, (int, np.integer)) else values)
+            if value_array.dtype.kind not in array_dtype_kinds[self._buffer.dtype.kind]:
+                self._buffer = promoted(self._buffer, self._size, value_array.dtype)
+        if self._buffer.dtype.kind == 'O' and not isinstance(selection, (int, np.integer)):
+            values = as_array(values, object)
+        self._buffer[:self._size][selection] = values
+    def __delitem__(self, selection):
+        if isinstance(selection, (int, np.integer)):
+            selection = [selection]
+        keep = np.ones(self._size, dtype=bool)
+        keep[as_indices(selection, self._size)] = False
+        data = self._buffer[:self._size][keep]
+        self._own(copy=False)
+        self._buffer = data
+        self._size = len(data)
+        self._version += 1
+        index_map = np.cumsum(keep) - 1
+        for view in self._views.values():
+            view._indices = index_map[view._indices[keep[view._indices]]]
+            view._version += 1
+    def _permute(self, indices):
+        indices = np.asarray(indices, dtype=np.intp)
+        self._own()
+        self._buffer[:self._size] = self._buffer[indices]
+        self._version += 1
+        old_to_new_indices = np.empty(len(indices), dtype=np.intp)
+        old_to_new_indices[indices] = np.arange(len(indices))
+        for view in self._views.values():
+            view._indices = old_to_new_indices[view._indices]
+            view._version += 1
+    def append(self, value):
+        self.extend([value])
+    def extend(self, values:T.Iterable[TC]):
+        assert self._origin is None, \
+            f'Cannot extend column ({self}) attached to table ({self._origin})'
+        self._extend(values)
+    def _extend(self, values):
+        dtype = self._buffer.dtype if self._size or self.dtype else None
+        values = as_array(values, None if self._size else dtype)
+        if dtype is None:
+            self._buffer = self._buffer.astype(values.dtype)
+        elif len(values) and values.dtype != self._buffer.dtype:
+            kinds = array_dtype_kinds.get(self._buffer.dtype.kind, '')
+            if values.dtype.kind not in kinds or not np.can_cast(values.dtype, self._buffer.dtype):
+                self._buffer = promoted(self._buffer, self._size, values.dtype)
+            values = values.astype(self._buffer.dtype)
+        extended_len = self._size + len(values)
+        if extended_len > len(self._buffer) or self._shared is not None:
+            buffer = np.empty(max(extended_len, 2 * len(self._buffer)), dtype=self._buffer.dtype)
+            buffer[:self._size] = self._buffer[:self._size]
+            self._own(copy=False)
+            self._buffer = buffer
+        indexes, start = synced_indexes(self), self._size
+        self._buffer[self._size:extended_len] = values
+        self._size = extended_len
+        self._version += 1
+        for index in indexes:
+            index._extended(start)
+    def clear(self):
+        self._own(copy=False)
+        self._buffer = self._buffer[:0]
+        self._size = 0
+        self._version += 1
+    def __str__(self):
+        return str(list(self))
+    def __repr__(self):
+        return repr(list(self))
+
+
+class IntColumn(ArrayColumn[int]):
+    dtype = 'int64'
+
+class FloatColumn(ArrayColumn[float]):
+    dtype = 'float64'
+
+class BoolColumn(ArrayColumn[bool]):
+    dtype = 'bool'
+
+class CategoryColumn(ArrayColumn[TC]):
+    dtype = 'int32'
+    def __init__(self, items=(), name=None):
+        Column.__init__(self, name=name)
+        self._shared = self._release = None
+        self.categories: list[TC] = []
+        self._code_of: dict[TC, int] = {}
+        self._values = np.empty(0, dtype=object) # categories as an array, for decoding many codes at once
+        self._buffer = self._encode(items)
+        self._size = len(self._buffer)
+    @property
+    def _codes(self):
+        return self._buffer[:self._size]
+    @property
+    def _data(self):
+        return self._decode(self._codes)
+    def _decode(self, codes):
+        if len(self._values) != len(self.categories):
+            self._values = np.empty(len(self.categories), dtype=object)
+            for code, category in enumerate(self.categories):
+                self._values[code] = category
+        return self._values[codes]
+    def _encode(self, values):
+        code_of = self._code_of
+        encoded = category_codes(values)
+        if encoded is not None:
+            codes, column = encoded
+            mapping = np.array([code_of.setdefault(value, len(code_of)) for value in column.categories], dtype=np.int32)
+            codes = mapping[codes] if len(mapping) else codes.copy()
+        else:
+            values = values.tolist() if is_array(values) else values if isinstance(values, list) else list(values)
+            for value in dict.fromkeys(values):
+                if value not in code_of:
+                    code_of[value] = len(code_of)
+            codes = np.fromiter(map(code_of.__getitem__, values), dtype=np.int32, count=len(values))
+        if len(code_of) > len(self.categories):
+            self.categories.extend(it.islice(code_of, len(self.categories), None))
+        return codes
+    def __iter__(self):
+        codes, categories = self._codes, self.categories
+        for i in range(0, len(codes), array_chunk_size):
+            yield from map(categories.__getitem__, codes[i:i+array_chunk_size].tolist())
+    def __contains__(self, item):
+        try:
+            code = self._code_of.get(item)
+        except TypeError:
+            return False
+        return code is not None and bool((self._codes == code).any())
+    def __getitem__(self, selection):
+        if isinstance(selection, (int, np.integer)):
+            return self.categories[self._codes[selection]]
+        return self._take(selection).tolist()
+    def _take(self, selection):
+        if isinstance(selection, slice):
+            return self._decode(self._codes[selection])
+        return self._decode(self._codes[as_indices(selection, self._size)])
+    def __setitem__(self, selection, values):
+        if isinstance(values, Table):
+            return
+        if isinstance(selection, (int, np.integer)):
+            self._version += 1
+            self._own()
+            self._codes[selection] = self._encode([values])[0]
+            return
+        if not isinstance(selection, slice):
+            selection = as_indices(selection, self._size)
+            assert len(selection) == len(values), \
+                f'Number of values ({len(values)}) does not match number of indices ({len(selection)})'
+        self._version += 1
+        self._own()
+        self._codes[selection] = self._encode(values)
+    def _extend(self, values):
+        ArrayColumn._extend(self, self._encode(values))
+
+def detached(column, name=None):
+    name = column.name if name is None else name
+    if not isinstance(column, ArrayColumn):
+        return column_base_type_map(column)(items=column, name=name)
+    copy = type(column)(name=name)
+    if isinstance(column, CategoryColumn):
+        copy.categories, copy._code_of = list(column.categories), dict(column._code_of)
+    if column._shared is None:
+        column._shared = [1]
+        column._release = wr.finalize(column, unshare, column._shared)
+    column._shared[0] += 1
+    copy._buffer, copy._size, copy._shared = column._buffer, column._size, column._shared
+    copy._release = wr.finalize(copy, unshare, copy._shared)
+    return copy
+
+def unshare(shared):
+    shared[0] -= 1
+
+def is_categorical(column):
+    return isinstance(column, CategoryColumn) or (
+        isinstance(column, ArrayColumnView) and isinstance(column._column, CategoryColumn))
+
+def category_codes(column):
+    if isinstance(column, CategoryColumn):
+        return column._codes, column
+    elif isinstance(column, ArrayColumnView) and isinstance(column._column, CategoryColumn):
+        return column._column._codes[column._indices], column._column
+    return None
+
+def category_column(codes, categories, name=None):
+    column = CategoryColumn(name=name)
+    column.categories = list(categories)
+    column._code_of = {category: code for code, category in enumerate(column.categories)}
+    column._buffer, column._size = codes, len(codes)
+    return column
+
+def category_ranks(column):
+    encoded = category_codes(column)
+    if encoded is None:
+        return None
+    codes, base = encoded
+    try:
+        order = sorted(range(len(base.categories)), key=base.categories.__getitem__)
+    except TypeError:
+        return None
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks[codes]
+
+def category_sort_keys(column):
+    ranks = category_ranks(column)
+    return column if ranks is None else ranks.tolist()
+
+def sort_ranks(column):
+    array = column_array(column)
+    if array is not None:
+        return array
+    ranks = category_ranks(column)
+    if ranks is not None:
+        return ranks
+    values = column if isinstance(column, list) else list(column)
+    try:
+        distinct = set(values)
+        nan = any(value != value for value in distinct)
+        rank_of = {value: rank for rank, value in enumerate(sorted(value for value in distinct if value == value))}
+    except TypeError: # unhashable or unorderable values
+        return None
+    if nan: # NaN gets a NaN rank, which sorts last in either direction
+        return np.fromiter((rank_of.get(value, np.nan) for value in values), dtype=np.float64, count=len(values))
+    return np.fromiter(map(rank_of.__getitem__, values), dtype=np.int64, count=len(values))
+
+def sorted_rows(order, values, reverse=False):
+    nans = [i for i in order if values[i] != values[i]] # NaN isn't equal to itself, and goes last either way
+    if nans:
+        order = [i for i in order if values[i] == values[i]]
+    return sorted(order, key=values.__getitem__, reverse=reverse) + nans
+
+def argsort_rows(keys, reverse=False):
+    size = len(keys[0]) if keys else 0
+    if np is None:
+        order = list(range(size))
+        for key in reversed(keys):
+            order = sorted_rows(order, list(key), reverse)
+        return order
+    order = np.arange(size)
+    for key in reversed(keys):
+        ranks = sort_ranks(key)
+        if ranks is None:
+            order = np.array(sorted_rows(order.tolist(), list(key), reverse), dtype=np.intp)
+        elif reverse and ranks.dtype.kind == 'f': # negated floats sort descending and keep NaN last
+            order = order[np.argsort(-ranks[order], kind='stable')]
+        elif reverse: # stable descending: sort the reversed keys ascending, then reverse
+            order = order[::-1][np.argsort(ranks[order[::-1]], kind='stable')[::-1]]
+        else:
+            order = order[np.argsort(ranks[order], kind='stable')]
+    return order
+
+def top_rows(keys, k, reverse=False):
+    array = keys if is_array(keys) else column_array(keys)
+    if array is None:
+        keys = keys if isinstance(keys, T.Sized) else list(keys)
+        nans = [i for i, key in enumerate(keys) if key != key] # NaN isn't equal to itself
+        if nans:
+            rows = [i for i, key in enumerate(keys) if key == key]
+            top = [rows[i] for i in top_rows([keys[i] for i in rows], k, reverse)]
+            return top + nans[:max(k - len(top), 0)]
+        if reverse: # negated rows put earlier rows first among equal keys
+            return [-i for _, i in hq.nlargest(k, zip(keys, range(0, -len(keys), -1)))]
+        return [i for _, i in hq.nsmallest(k, zip(keys, range(len(keys))))]
+    k = max(0, min(k, len(array)))
+    if not k:
+        return np.empty(0, dtype=np.intp)
+    nan = np.isnan(array) if array.dtype.kind == 'f' else None
+    if nan is not None and nan.any(): # NaN compares false to everything, so it goes last like in a full sort
+        rows = np.flatnonzero(~nan)
+        top = rows[top_rows(array[rows], k, reverse)]
+        return np.concatenate([top, np.flatnonzero(nan)[:k - len(top)]])
+    if reverse:
+        kth = np.partition(array, len(array) - k)[len(array) - k]
+        candidates = np.flatnonzero(array >= kth)[::-1]
+    else:
+        kth = np.partition(array, k - 1)[k - 1]
+        candidates = np.flatnonzero(array <= kth)
+    order = np.argsort(array[candidates], kind='stable')
+    return candidates[order[::-1] if reverse else order][:k]
+
+def shared_category_codes(lkeys, rkeys):
+    lkeys, rkeys = list(lkeys), list(rkeys)
+    for i, (lkey, rkey) in enumerate(zip(lkeys, rkeys)):
+        lencoded, rencoded = category_codes(lkey), category_codes(rkey)
+        if lencoded is not None and rencoded is not None:
+            (lcodes, lbase), (rcodes, rbase) = lencoded, rencoded
+            mapping = np.array([lbase._code_of.get(value, -1) for value in rbase.categories], dtype=np.int64)
+            lkeys[i], rkeys[i] = lcodes.tolist(), (mapping[rcodes] if len(mapping) else rcodes).tolist()
+    return lkeys, rkeys
+
+array_column_types = {} if np is None else {int: IntColumn, float: FloatColumn, bool: BoolColumn}
+array_column_kinds = {'i': IntColumn, 'f': FloatColumn, 'b': BoolColumn}
+
+def array_column(array, name=None):
+    column_type = array_column_kinds.get(array.dtype.kind, ArrayColumn)
+    column = column_type(name=name)
+    column._buffer = array if column_type.dtype is None else array.astype(column_type.dtype, copy=False)
+    column._size = len(array)
+    return column
+
+
+class ArrayColumnView(ColumnOps, ColumnView, T.Generic[TC]):
+    def __init__(self, column:ArrayColumn, indices, name=None):
+        if isinstance(column, ArrayColumnView):
+            indices = column._indices[as_indices(indices, len(column))]
+            column = column._column
+        else:
+            indices = as_indices(indices, len(column))
+        ColumnView.__init__(self, column, indices, name=name)
+        self._indices = indices
+        self._column._views[id(self)] = self
+    def __array__(self, dtype=None, copy=None):
+        return self._take(slice(None)) if dtype is None else self._take(slice(None)).astype(dtype)
+    def __len__(self):
+        return len(self._indices)
+    def __iter__(self):
+        for i in range(0, len(self._indices), array_chunk_size):
+            yield from self._column._take(self._indices[i:i+array_chunk_size]).tolist()
+    def __contains__(self, item):
+        return any(item == e for e in self)
+    def __getitem__(self, selection):
+        if isinstance(selection, (int, np.integer)):
+            return self._column[int(self._indices[selection])]
+        return self._take(selection).tolist()
+    def _take(self, selection):
+        if isinstance(selection, slice):
+            return self._column._take(self._indices[selection])
+        return self._column._take(self._indices[as_indices(selection, len(self))])
+    def __setitem__(self, selection, values):
+        if isinstance(values, Table):
+            return
+        if isinstance(selection, (int, np.integer)):
+            self._column[int(self._indices[selection])] = values
+        elif isinstance(selection, slice):
+            self._column[self._indices[selection]] = values
+        else:
+            self._column[self._indices[as_indices(selection, len(self))]] = values
+    def _permute(self, indices):
+        self._indices = self._indices[np.asarray(indices, dtype=np.intp)]
+        self._version += 1
+    def __delitem__(self, selection):
+        if isinstance(selection, (int, np.integer)):
+            selection = [selection]
+        to_delete = as_indices(selection, len(self))
+        assert all(-len(self) <= i < len(self) for i in to_delete.tolist()), \
+            f'Indices in {selection} are beyond the index bounds of of {self} (len {len(self)}) for deletion'
+        self._indices = np.delete(self._indices, to_delete)
+        self._version += 1
+    def clear(self):
+        self._indices = self._indices[:0]
+        self._version += 1
+    def extend(self, values:T.Iterable[TC]):
+        raise TypeError(f'Column of type {type(self)} does not support extend: {self}')
+    def _extend(self, indices):
+        self._indices = np.concatenate((self._indices, as_indices(indices, len(self._column))))
+        self._version += 1
+    def __str__(self):
+        return str(list(self))
+    def __repr__(self):
+        return repr(list(self))
+
+
 IDColumn = Column
 setattr(sys.modules[__name__], 'IDColumn', DictColumn)
 
@@ -0,0 +1,670 @@
+import ezpyzy as ez
+import ezpyzy.table as ezt
+import dataclasses as dc
+import gc
+
+
+with ez.test('define', crash=True):
+
+    @dc.dataclass
+    class Turn(ez.Table):
+        text: ez.ColStr = None
+        speaker: ez.ColStr = None
+        dialogue: ez.ColStr = None
+        index: ez.ColInt = None
+        score: ez.ColFloat = None
+        id: ez.ColID = None
+
+    @dc.dataclass
+    class Dialogue(ez.Table):
+        dialogue: ez.ColStr = None
+        domain: ez.ColStr = None
+
+    def make_turns():
+        return Turn.of([
+            dict(text='hi', speaker='a', dialogue='d1', index=0, score=0.5, id='x'),
+            dict(text='yo', speaker='b', dialogue='d1', index=1, score=0.7, id='y'),
+            dict(text='ok', speaker='a', dialogue='d2', index=0, score=0.2, id='z'),
+        ])
+
+
+with ez.test('typed columns are array backed'):
+    turns = make_turns()
+    assert isinstance(turns.index, ezt.IntColumn)
+    assert isinstance(turns.score, ezt.FloatColumn)
+    assert isinstance(turns.text, ezt.ListColumn)
+    assert list(turns.index) == [0, 1, 0]
+    assert type(turns.index[0]) is int
+    assert list(turns.score[[True, False, True]]) == [0.5, 0.2]
+    assert list(turns.score[1:]) == [0.7, 0.2]
+
+
+with ez.test('array column selections are copied lists'):
+    turns = make_turns()
+    turns.index[0] = 3
+    assert turns.index[:1] + turns.index[1:] == [3, 1, 0] and turns.score[[2, 0]] == [0.2, 0.5]
+    turns().add_index(turns.index)
+    turns.index[:][0] = 50
+    assert list(turns.index) == [3, 1, 0] and list(turns[turns.index == 3].text) == ['hi']
+    assert turns[[0, 1]].index[:] == [3, 1] and turns[[0, 1]].score[[True, False]] == [0.5]
+    if ezt.np is not None:
+        assert not ezt.np.asarray(turns.index).flags.writeable
+
+
+with ez.test('array columns fall back to objects'):
+    turn = Turn('hello')
+    assert list(turn.index) == [None]
+    turns = make_turns()
+    turns.index[1] = None
+    assert list(turns.index) == [0, None, 0]
+
+
+with ez.test('array column views'):
+    turns = make_turns()
+    view = turns[[2, 0]]
+    assert isinstance(view.score, ezt.ArrayColumnView)
+    assert list(view.score) == [0.2, 0.5]
+    view.score[0] = 0.9
+    assert list(turns.score) == [0.5, 0.7, 0.9]
+    turns().sort(turns.index)
+    assert list(view.id) == ['z', 'x'] and list(view.score) == [0.9, 0.5]
+    del turns[0]
+    assert list(view.id) == ['z'] and list(view.score) == [0.9]
+
+
+with ez.test('array column concatenation'):
+    turns = make_turns()
+    turns += [dict(text='bye', speaker='b', dialogue='d2', index=1, score=0.1, id='w')]
+    assert list(turns.index) == [0, 1, 0, 1]
+    copy = ~turns[1:]
+    assert isinstance(copy.score, ezt.FloatColumn)
+    assert list(copy.score) == [0.7, 0.2, 0.1]
+
+
+with ez.test('vectorized elementwise ops'):
+    turns = make_turns()
+    doubled = turns.score * 2
+    assert isinstance(doubled, ezt.FloatColumn)
+    assert list(doubled) == [1.0, 1.4, 0.4]
+    assert list(turns.index + turns.index) == [0, 2, 0]
+    assert list(-turns.index) == [0, -1, 0]
+    turns.index += 1
+    assert list(turns.index) == [1, 2, 1]
+    assert list(turns.text + '!') == ['hi!', 'yo!', 'ok!']
+
+
+with ez.test('vectorized ops keep python semantics on failure', raises=ZeroDivisionError):
+    turns = make_turns()
+    turns.score / turns.index
+
+
+with ez.test('vectorized int ops fall back instead of overflowing'):
+    turns = make_turns()
+    turns.index[1] = 2**62
+    big = turns.index
+    assert list(big * 4) == [0, 2**64, 0] and list(big + big) == [0, 2**63, 0] and list(big ** 2) == [0, 2**124, 0]
+    assert list(-big) == [0, -2**62, 0] and list(make_turns().index ** 3) == [0, 1, 0]
+
+
+with ez.test('comparison masks select and delete rows'):
+    turns = make_turns()
+    mask = turns.score > 0.4
+    assert isinstance(mask, ezt.BoolColumn)
+    assert list(turns[mask].id) == ['x', 'y']
+    assert list(turns[turns.text == 'ok'].id) == ['z']
+    assert list(turns.text[mask]) == ['hi', 'yo']
+    del turns[turns.index == 1]
+    assert list(turns.id) == ['x', 'z']
+    assert list(turns['z'].text) == ['ok']
+    assert list(turns[turns.score < 0.3]['z'].text) == ['ok']
+
+
+with ez.test('joins'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd3'], domain=['food', 'travel']))
+    inner = turns.dialogue & dialogues.dialogue
+    assert list(inner.id) == ['x', 'y'] and list(inner.domain) == ['food', 'food']
+    assert isinstance(inner.score, ezt.FloatColumn)
+    left = turns.dialogue << dialogues.dialogue
+    assert list(left.domain) == ['food', 'food', None]
+    full = turns.dialogue | dialogues.dialogue
+    assert list(full.dialogue) == ['d1', 'd1', 'd2', 'd3']
+    assert list(full.domain) == ['food', 'food', None, 'travel']
+    assert list(full.index) == [0, 1, 0, None]
+    right = turns.dialogue >> dialogues.dialogue
+    assert list(right.domain) == ['food', 'food', 'travel']
+    assert list(right.text) == ['hi', 'yo', None]
+
+
+with ez.test('in-place joins'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd3'], domain=['food', 'travel']))
+    original = turns
+    turns.dialogue &= dialogues.dialogue
+    assert turns is original
+    assert list(turns.domain) == ['food', 'food']
+    assert list(turns.dialogue) == ['d1', 'd1']
+    turns = make_turns()
+    turns[turns.dialogue] <<= dialogues.dialogue
+    assert list(turns.text) == ['hi', 'yo', 'ok']
+    assert list(turns.domain) == ['food', 'food', None]
+
+
+with ez.test('merge joins on sorted tables'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d3', 'd1'], domain=['travel', 'food']))
+    assert turns().sorted_by == []
+    turns().sort(turns.dialogue)
+    dialogues().sort(dialogues.dialogue)
+    assert turns().sorted_by == [turns.dialogue]
+    hashed = turns[turns.dialogue]().join(dialogues.dialogue, 'full', method='hash')
+    merged = turns.dialogue | dialogues.dialogue
+    assert list(merged.dialogue) == list(hashed.dialogue) == ['d1', 'd1', 'd2', 'd3']
+    assert list(merged.domain) == list(hashed.domain)
+    right = turns[turns.dialogue]().join(dialogues.dialogue, 'right', method='merge')
+    assert list(right.domain) == ['food', 'food', 'travel']
+    turns.dialogue[0] = 'd9'
+    assert turns().sorted_by == []
+
+
+with ez.test('merge join requires sorted keys', raises=AssertionError):
+    turns = make_turns()
+    turns[turns.index]().join(make_turns().index, method='merge')
+
+
+with ez.test('group aggregation'):
+    turns = make_turns()
+    turns += [dict(text='bye', speaker='b', dialogue='d1', index=2, score=0.1, id='w')]
+    stats = turns().group(
+        turns.dialogue,
+        n='count',
+        total=(turns.index, 'sum'),
+        mean=(turns.score, 'mean'),
+        best=(turns.score, 'max'),
+        opener=(turns.text, 'first'),
+        closer=(turns.text, 'last'),
+        speakers=('speaker', set),
+    )
+    assert list(stats.dialogue) == ['d1', 'd2']
+    assert list(stats.n) == [3, 1]
+    assert list(stats.total) == [3, 0]
+    assert [round(x, 3) for x in stats.mean] == [0.433, 0.2]
+    assert list(stats.best) == [0.7, 0.2]
+    assert list(stats.opener) == ['hi', 'ok'] and list(stats.closer) == ['bye', 'ok']
+    assert list(stats.speakers) == [{'a', 'b'}, {'a'}]
+    by_pair = turns().group(turns[turns.dialogue, turns.speaker], texts=(turns.text, 'list'))
+    assert list(by_pair.speaker) == ['a', 'b', 'a']
+    assert list(by_pair.texts) == [['hi'], ['yo', 'bye'], ['ok']]
+    by_index = turns().group(turns.index, low=(turns.score, 'min'))
+    assert list(by_index.index) == [0, 1, 2] and list(by_index.low) == [0.2, 0.7, 0.1]
+
+
+with ez.test('parallel apply'):
+    turns = make_turns()
+    lengths = turns().apply(lambda text, index: len(text) + index, processes=2)
+    assert list(lengths) == [2, 3, 2]
+    rows = turns().apply(lambda row: dict(id=row.id(), loud=row.text().upper()), processes=2)
+    assert list(rows.id) == ['x', 'y', 'z'] and list(rows.loud) == ['HI', 'YO', 'OK']
+
+
+with ez.test('csv round trip decodes by column type'):
+    turns = make_turns()
+    turns.index[1] = None
+    turns.text[2] = 'say "ok"'
+    loaded = Turn.of(turns().save())
+    assert list(loaded.index) == [0, None, 0]
+    assert list(loaded.text) == ['hi', 'yo', 'say "ok"']
+    assert list(loaded.score) == [0.5, 0.7, 0.2]
+    columns = ezt.read_csv_columns(turns().save(), ezt.column_type_map(Turn), chunk_size=2)
+    assert list(columns['id']) == ['x', 'y', 'z'] and list(columns['score']) == [0.5, 0.7, 0.2]
+
+
+with ez.test('streaming csv save'):
+    turns = make_turns()
+    turns.score[0] = None
+    saved = turns().save()
+    assert saved.splitlines()[1] == '"""hi""","""a""","""d1""",0,null,"""x"""'
+    assert turns().save(chunk_size=2) == saved
+    assert turns[1:]().save() == '\r\n'.join([saved.splitlines()[0], *saved.splitlines()[2:]]) + '\r\n'
+
+
+with ez.test('binary ezt round trip'):
+    import tempfile, pathlib
+    turns = make_turns()
+    turns.index[1] = None
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / 'turns.ezt'
+        turns().save(path)
+        loaded = Turn.of(path)
+        assert [list(column) for column in loaded()] == [list(column) for column in turns()]
+        assert loaded().id is loaded.id
+        subset = Turn.of(path, columns=['score', 'text'])
+        assert list(subset().column_names) == ['score', 'text']
+        subset.score[0] = 1.0
+        assert list(Turn.of(path, columns=['score']).score) == [0.5, 0.7, 0.2]
+        assert list(ez.File(path).load().speaker) == ['a', 'b', 'a']
+
+
+with ez.test('lazy plans'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd2'], domain=['food', 'travel']))
+    plan = (turns().lazy()
+        .apply(lambda text: text.upper(), 'loud')
+        .apply(lambda loud, index: f'{loud}{index}', 'tag')
+        .apply(lambda text: len(text), 'unused')
+        .join(dialogues, 'dialogue')
+        .filter(lambda score: score > 0.3)
+        .filter(lambda domain: domain == 'food')
+        .select('tag', 'domain', 'score'))
+    result = plan.collect()
+    assert list(result().column_names) == ['tag', 'domain', 'score']
+    assert list(result.tag) == ['HI0', 'YO1'] and list(result.domain) == ['food', 'food']
+    explained = plan.explain().splitlines()
+    assert explained[0] == 'select [tag, domain, score]'
+    assert explained[2].strip() == 'apply loud=<lambda>(text), tag=<lambda>(loud, index)'
+    assert explained[3].strip() == 'filter <lambda>(score)'
+    assert explained[4].strip() == 'scan Turn [text, dialogue, index, score]'
+    assert 'unused' not in plan.explain()
+    ordered = turns().lazy().sort('score', reverse=True).select('id').collect()
+    assert list(ordered.id) == ['y', 'x', 'z'] and list(turns.id) == ['x', 'y', 'z']
+
+
+with ez.test('lazy applies overwrite columns with the same name'):
+    turns = make_turns()
+    plan = turns().lazy().apply(lambda text: text.upper(), 'text').apply(lambda text, index: f'{text}{index}', 'tag')
+    result = plan.collect()
+    assert list(result().column_names) == plan.columns == ['text', 'speaker', 'dialogue', 'index', 'score', 'id', 'tag']
+    assert list(result.text) == ['HI', 'YO', 'OK'] and list(result.tag) == ['HI0', 'YO1', 'OK0']
+    assert list(turns.text) == ['hi', 'yo', 'ok']
+    only = turns().lazy().apply(lambda score: score * 2, 'score').select('id', 'score').collect()
+    assert list(only.score) == [1.0, 1.4, 0.4] and list(turns.score) == [0.5, 0.7, 0.2]
+
+
+with ez.test('lazy joins gather only needed columns'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd2'], domain=['food', 'travel']))
+    gathered, gather = [], ezt.gather
+    ezt.gather = lambda column, indices, name=None: gathered.append(column.name) or gather(column, indices, name)
+    try:
+        result = turns().lazy().join(dialogues, 'dialogue').select('text', 'domain').collect()
+    finally:
+        ezt.gather = gather
+    assert sorted(gathered) == ['dialogue', 'domain', 'text'] and list(result.domain) == ['food', 'food', 'travel']
+    topics = ez.Table.of(dict(key=['d1', 'd3'], topic=['food', 'travel']))
+    plan = turns().lazy().join(topics, [('dialogue', 'key')], how='right')
+    assert list(plan.collect()().column_names) == plan.columns == ['key', 'topic', 'text', 'speaker', 'index', 'score', 'id']
+    right = plan.filter(lambda topic: topic == 'travel').select('key', 'text')
+    assert right.explain().splitlines()[-1].strip() == 'scan Table [key, topic]'
+    assert list(right.collect().key) == ['d3'] and list(right.collect().text) == [None]
+
+
+with ez.test('secondary indexes'):
+    turns = make_turns()
+    by_dialogue = turns().add_index(turns.dialogue)
+    by_score = turns().add_index('score', kind='sorted')
+    assert turns().indexes == [by_dialogue, by_score] and by_dialogue.nbytes > 0 and by_score.nbytes > 0
+    assert list(turns[turns.dialogue == 'd1'].id) == ['x', 'y']
+    assert list(turns[turns.score >= 0.5].id) == ['x', 'y'] and list(turns[turns.score < 0.5].id) == ['z']
+    turns += [dict(text='bye', speaker='b', dialogue='d1', index=2, score=0.1, id='w')]
+    assert by_dialogue.is_synced and not by_score.is_synced
+    assert list(turns[turns.dialogue == 'd1'].id) == ['x', 'y', 'w']
+    assert list(turns[turns.score <= 0.2].id) == ['z', 'w']
+    turns.dialogue[0] = 'd2'
+    del turns[turns.dialogue == 'd2']
+    turns().sort(turns.score)
+    assert list(turns[turns.dialogue == 'd1'].id) == ['w', 'y']
+    assert list(turns[turns.score > 0.1].id) == ['y']
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd3', 'd1'], domain=['food', 'travel', 'chat']))
+    hashed = turns.dialogue | dialogues.dialogue
+    dialogues().add_index(dialogues.dialogue)
+    indexed = turns.dialogue | dialogues.dialogue
+    assert [list(column) for column in indexed()] == [list(column) for column in hashed()]
+
+
+with ez.test('indexed comparisons skip NaN like unindexed ones'):
+    nan = float('nan')
+    values = ez.Table.of(dict(s=list('abcd'), f=[0.1, nan, 0.7, 0.9]))
+    unindexed = [list(values[mask].s) for mask in (
+        values.f > 0.5, values.f >= 0.1, values.f < 0.8, values.f == nan, values.f == 0.7)]
+    values().add_index('f', kind='sorted')
+    indexed = [list(values[mask].s) for mask in (
+        values.f > 0.5, values.f >= 0.1, values.f < 0.8, values.f == nan, values.f == 0.7)]
+    assert indexed == unindexed == [['c', 'd'], ['a', 'c', 'd'], ['a', 'c'], [], ['c']]
+    assert list(turns().group(turns.dialogue)['d1'].id) == ['w', 'y']
+    turns().drop_index(turns.score)
+    assert turns().indexes == [by_dialogue]
+
+
+with ez.test('compact view indices'):
+    import array
+    turns = make_turns()
+    turns += [dict(text='bye', speaker='b', dialogue='d1', index=2, score=0.1, id='w')]
+    tail = turns[1:]
+    assert isinstance(tail.text._indices, range) and tail().index == range(1, 4)
+    assert list(tail.text) == ['yo', 'ok', 'bye'] and list(tail.text[::-1]) == ['bye', 'ok', 'yo']
+    assert isinstance(tail[1:].text._indices, range) and list(tail[1:].id) == ['z', 'w']
+    picked = tail[[2, 0]]
+    assert isinstance(picked.text._indices, array.array) and list(picked.text) == ['bye', 'yo']
+    assert list(tail['w'].text) == ['bye'] and 'ok' in tail.text
+    tail.text[0] = 'hey'
+    assert list(turns.text) == ['hi', 'hey', 'ok', 'bye']
+    del turns[2]
+    assert list(tail.text) == ['hey', 'bye'] and list(picked.id) == ['w', 'y']
+    turns().sort(turns.id)
+    assert list(turns.id) == ['w', 'x', 'y'] and list(tail.id) == ['y', 'w']
+
+
+with ez.test('tombstoned deletes'):
+    turns = make_turns()
+    turns += [dict(text=str(i), speaker='c', dialogue='d3', index=i, score=0.0, id=f'n{i}') for i in range(9)]
+    view = turns[turns.speaker, turns.text][2:6]
+    del turns[1]
+    del turns[-1]
+    assert turns.text._dead == [1, 11] and len(turns) == 10 and len(turns.text) == 10
+    assert list(turns.text)[:4] == ['hi', 'ok', '0', '1'] and turns.text[1] == 'ok' and turns.text[-1] == '7'
+    assert list(view.text) == ['ok', '0', '1', '2'] and not turns.text._dead
+    del turns[[0, 2]]
+    assert list(turns.id)[:3] == ['z', 'n1', 'n2'] and list(view.text) == ['ok', '1', '2']
+    del turns[turns.speaker == 'c']
+    assert not turns.text._dead and list(turns.text) == ['ok'] and list(view.text) == ['ok']
+    del turns[0]
+    turns += [dict(text='new', speaker='d', dialogue='d4', index=0, score=0.0, id='z')]
+    assert list(turns().compact().text) == ['new'] and turns['z'].text() == 'new'
+
+
+with ez.test('tombstoned deletes are hidden from list methods'):
+    column = ezt.ListColumn('abcdefghij')
+    del column[1]
+    assert column._dead and 'b' not in column and 'c' in column and repr(column) == repr(list('acdefghij'))
+    assert list(reversed(column))[-2:] == ['c', 'a'] and column.index('c') == 1 and column.count('b') == 0
+    column.append('z')
+    assert len(column) == 10 and list(column)[-2:] == ['j', 'z'] and column.pop() == 'z' and len(column) == 9
+    turns = make_turns()
+    turns += [dict(text=str(i), speaker='c', dialogue='d3', index=i, score=0.0, id=f'n{i}') for i in range(9)]
+    del turns[1]
+    assert turns.text._dead and 'yo' not in turns.text and 'y' not in turns and 'x' in turns
+    ids = ezt.DictColumn(['x', 'y', 'z'])
+    ids.remove('x')
+    assert 'x' not in ids and ids._ids == {'y': 0, 'z': 1}
+
+
+with ez.test('views select the right rows after a tombstoned delete'):
+    letters = ez.Table.of(dict(s=list('abcdefghij'), n=[[i] for i in range(10)]))
+    del letters[0]
+    assert letters.s._dead and list(letters[2:5].s) == ['d', 'e', 'f']
+    assert list(letters[[0, 1, 2]].s) == ['b', 'c', 'd']
+    assert list(letters[[s == 'j' for s in letters.s]].s) == ['j']
+    assert [row.s() for row in letters] == list('bcdefghij')
+    assert list(letters().lazy().filter(lambda s: s > 'h').collect().s) == ['i', 'j']
+
+
+with ez.test('bulk id columns'):
+    turns = make_turns()
+    turns += [
+        dict(text='bye', speaker='b', dialogue='d1', index=2, score=0.1, id='w'),
+        dict(text='new', speaker='a', dialogue='d3', index=0, score=0.9, id=None),
+    ]
+    assert turns['w'].text() == 'bye' and turns['x'].text() == 'hi'
+    assert len(turns.id[4]) == 12 and turns[turns.id[4]].text() == 'new'
+    ids = ezt.DictColumn([None] * 10000)
+    assert len(ids._ids) == 10000 and all(c in ez.short_uuid.alphabet for c in ids[0])
+    assert ids._ids[ids[9999]] == 9999
+
+
+with ez.test('duplicate ids are rejected', raises=AssertionError):
+    turns = make_turns()
+    turns += [dict(text='again', speaker='a', dialogue='d1', index=3, score=0.0, id='x')]
+
+
+with ez.test('display shows head and tail rows'):
+    turns = make_turns()
+    turns += [dict(text='x' * 5000, speaker='b', dialogue='d1', index=i, score=0.1, id=None) for i in range(30)]
+    lines = str(turns).splitlines()
+    assert len(lines) == 3 + ezt.display_num_rows + 1 and lines[13].startswith('...')
+    assert lines[3].startswith('hi') and lines[-1].split('|')[3].strip() == '29'
+    assert len(lines[3]) < 2 * ezt.display_cell_limit
+    short = turns[:2]().display(max_cell_width=4, max_num_rows=None).splitlines()
+    assert short[1:] == ['text|sp..|di..|in..|sc..|id', '----|----|----|----|----|--', 'hi  |a   |d1  |0   |0.5 |x ', 'yo  |b   |d1  |1   |0.7 |y ']
+
+
+with ez.test('partitioned tables'):
+    import tempfile, pathlib
+    turns = make_turns()
+    turns += [dict(text=f't{i}', speaker='ab'[i % 2], dialogue=f'd{i % 3}', index=i, score=i / 10, id=None) for i in range(7)]
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd2'], domain=['food', 'travel']))
+    with tempfile.TemporaryDirectory() as directory:
+        parts = turns().partition(pathlib.Path(directory) / 'turns', rows=4, resident=1)
+        assert parts.sizes() == [4, 4, 2] and len(parts) == 10 and len(parts._resident) == 0
+        assert parts[5].text() == 't2' and list(parts[2:7].text) == ['ok', 't0', 't1', 't2', 't3']
+        assert list(parts['text', 'index'][3:5]().column_names) == ['text', 'index']
+        assert list(parts[lambda chunk: chunk.index > 4].text) == ['t5', 't6'] and len(parts._resident) == 1
+        assert list(parts.apply(lambda text: text.upper()))[:3] == ['HI', 'YO', 'OK']
+        joined = parts.join(dialogues, 'dialogue')
+        assert list(joined.text) == list((turns.dialogue & dialogues.dialogue).text)
+        stats = parts.group('dialogue', n='count', total=('index', 'sum'), mean=('score', 'mean'), texts=('text', 'list'))
+        expected = turns().group(turns.dialogue, n='count', total=(turns.index, 'sum'), texts=(turns.text, 'list'))
+        assert list(stats.dialogue) == list(expected.dialogue) and list(stats.n) == list(expected.n)
+        assert list(stats.total) == list(expected.total) and list(stats.texts) == list(expected.texts)
+        assert round(stats.mean[0], 3) == 0.425
+        assert list(parts.group('speaker')['b'].text) == ['yo', 't1', 't3', 't5']
+        lengths = parts.apply(lambda text: len(text), out=pathlib.Path(directory) / 'lengths', name='length')
+        assert isinstance(lengths, ez.Partitions) and [len(chunk) for chunk in lengths.chunks()] == [4, 4, 2]
+        assert list(lengths[:].length) == [2, 2, 2, 2, 2, 2, 2, 2, 2, 2]
+        assert parts[-1].text() == 't6' and parts[-10].text() == 'hi'
+
+
+with ez.test('partition indexes are range checked', raises=IndexError):
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as directory:
+        make_turns()().partition(pathlib.Path(directory) / 'turns', rows=2)[3]
+
+
+with ez.test('partitions are not written into non-empty directories', raises=AssertionError):
+    with tempfile.TemporaryDirectory() as directory:
+        (pathlib.Path(directory) / '999999.ezt').write_bytes(b'')
+        ez.Partitions.of(directory, make_turns())
+
+
+with ez.test('fast row iteration'):
+    turns = make_turns()
+    rows = list(turns().rows())
+    assert rows[1].text == 'yo' and rows[1].index == 1 and rows[2][0] == 'ok' and type(rows[1].index) is int
+    assert [row.id for row in turns[turns.index == 0]().rows()] == ['x', 'z']
+    for row in turns:
+        row.text(row.text() + '!')
+    assert list(turns.text) == ['hi!', 'yo!', 'ok!']
+    views = list(turns[1:])
+    assert views[0].id() == 'y' and views[1]().index == [1] and views[0].text._origin is views[0]
+
+
+@dc.dataclass
+class Scored(ez.Table):
+    name: 'ez.ColStr' = None
+    score: 'ez.ColFloat' = None
+
+with ez.test('compiled schemas'):
+    assert ezt.column_type_map(Scored) is ezt.column_type_map(Scored())
+    assert ezt.column_type_map(Scored)['score'] == ezt.column_type_map(Turn)['score']
+    assert type(Scored('a', 0.5).score) is type(make_turns().score)
+    assert ezt.table_schema(Turn).id_column == 'id' and ezt.table_schema(Scored).id_column is None
+    turns = make_turns()
+    assert turns().id is turns.id and turns['y'].text() == 'yo'
+    joined = turns.dialogue & Dialogue.of(dict(dialogue=['d1'], domain=['food'])).dialogue
+    assert ezt.column_aliases(joined)[id(joined.dialogue)] == ['dialogue'] and list(joined[1:].domain) == ['food']
+
+
+with ez.test('bulk concatenation'):
+    shards = [make_turns(), make_turns()[1:], make_turns()[:1]]
+    shards[1].id[:] = ['p', 'q']
+    shards[2].id[:] = ['r']
+    combined = Turn.concat(shards)
+    assert list(combined.text) == ['hi', 'yo', 'ok', 'yo', 'ok', 'hi'] and list(combined.id) == ['x', 'y', 'z', 'p', 'q', 'r']
+    assert list(combined.index) == [0, 1, 0, 1, 0, 0] and len(shards[0]) == 3
+    assert len(Turn.concat([])) == 0
+
+
+with ez.test('bulk concatenation rejects duplicate ids', raises=AssertionError):
+    Turn.concat([make_turns(), make_turns()])
+
+
+with ez.test('bulk concatenation matches columns by name'):
+    combined = ez.Table.concat([dict(x=[1], y=['a']), dict(y=['b'], x=[2])])
+    assert list(combined.x) == [1, 2] and list(combined.y) == ['a', 'b']
+    turns = make_turns()
+    turns += ez.Table.of(dict(score=[0.9], id=['w'], text=['new'], speaker=['c'], dialogue=['d3'], index=[4]))
+    assert list(turns.text)[-1] == 'new' and list(turns.score)[-1] == 0.9
+
+
+with ez.test('bulk concatenation rejects different column names', raises=AssertionError):
+    ez.Table.concat([dict(x=[1], y=['a']), dict(x=[2], z=['b'])])
+
+
+with ez.test('bulk concatenation rejects different id columns', raises=AssertionError):
+    @dc.dataclass
+    class Keyed(ez.Table):
+        x: ez.ColID = None
+        y: ez.ColStr = None
+    ez.Table.concat([ez.Table.of(dict(x=['a'], y=['b'])), Keyed.of(dict(x=['c'], y=['d']))])
+
+
+with ez.test('columnar build from dict rows'):
+    rows = [dict(text='hi', index=0), dict(index=1, mood='ok'), dict(text='yo')]
+    turns = Turn.of(iter(rows))
+    assert list(turns.text) == ['hi', None, 'yo'] and list(turns.mood) == [None, 'ok', None]
+    assert list(turns.index) == [0, 1, None] and len(turns.id) == 3
+    assert list(turns().column_names)[:3] == ['text', 'index', 'mood']
+    assert ezt.dict_columns(iter(rows), ('speaker',), chunk_size=2) == dict(
+        text=['hi', None, 'yo'], index=[0, 1, None], mood=[None, 'ok', None], speaker=[None, None, None])
+    assert list(Turn.of(dict(text=str(i)) for i in range(5)).text) == ['0', '1', '2', '3', '4']
+
+
+@dc.dataclass
+class Speaker(ez.Table):
+    speaker: ez.ColCat = None
+    name: ez.ColStr = None
+
+with ez.test('categorical columns'):
+    import tempfile, pathlib
+    speakers = Speaker.of(dict(speaker=['b', 'a', 'c', 'a'], name=['Bo', 'Al', 'Cy', 'Ann']))
+    assert isinstance(speakers.speaker, ez.CategoryColumn) and speakers.speaker.categories == ['b', 'a', 'c']
+    assert list(speakers.speaker._codes) == [0, 1, 2, 1] and speakers.speaker[3] == 'a'
+    assert list(speakers[speakers.speaker == 'a'].name) == ['Al', 'Ann'] and not any(speakers.speaker == 'q')
+    assert list(speakers[1:].speaker) == ['a', 'c', 'a'] and 'c' in speakers.speaker
+    groups = speakers().group(speakers.speaker, n='count')
+    assert isinstance(groups.speaker, ez.CategoryColumn) and list(groups.speaker) == ['b', 'a', 'c']
+    assert list(groups.n) == [1, 2, 1] and list(speakers().group(speakers.speaker)['a'].name) == ['Al', 'Ann']
+    turns = make_turns()
+    joined = Speaker.of(dict(speaker=list(turns.speaker))).speaker & speakers.speaker
+    assert sorted(zip(joined.speaker, joined.name)) == [('a', 'Al'), ('a', 'Al'), ('a', 'Ann'), ('a', 'Ann'), ('b', 'Bo')]
+    speakers.speaker[0] = 'd'
+    assert list(speakers.speaker) == ['d', 'a', 'c', 'a'] and speakers.speaker.categories == ['b', 'a', 'c', 'd']
+    assert list(speakers().sort(speakers.speaker).name) == ['Al', 'Ann', 'Cy', 'Bo']
+    with tempfile.TemporaryDirectory() as directory:
+        for file in ('speakers.ezt', 'speakers.csv'):
+            speakers().save(pathlib.Path(directory) / file)
+            loaded = Speaker.of(pathlib.Path(directory) / file)
+            assert isinstance(loaded.speaker, ez.CategoryColumn) and list(loaded.speaker) == ['a', 'a', 'c', 'd']
+        loaded = ez.Table.of(pathlib.Path(directory) / 'speakers.ezt')
+        assert isinstance(loaded.speaker, ez.CategoryColumn) and loaded.speaker.categories == ['b', 'a', 'c', 'd']
+
+
+with ez.test('detached copies share array buffers until written'):
+    turns = make_turns()
+    copy = ~turns
+    assert copy.index._buffer is turns.index._buffer and copy.text is not turns.text
+    copy.index[0] = 5
+    assert list(turns.index) == [0, 1, 0] and list(copy.index) == [5, 1, 0]
+    assert copy.score._buffer is turns.score._buffer
+    turns().sort(turns.score)
+    assert list(copy.score) == [0.5, 0.7, 0.2] and list(turns.score) == [0.2, 0.5, 0.7]
+    extended = turns - Dialogue.of(dict(domain=['x', 'y', 'z']))
+    assert extended.index._buffer is turns.index._buffer and list(extended.domain) == ['x', 'y', 'z']
+    extended += dict(text=['new'], speaker=['c'], dialogue=['d3'], index=[9], score=[0.1], id=['w'], domain=['q'])
+    assert list(extended.index) == [0, 0, 1, 9] and list(turns.index) == [0, 0, 1] and 'domain' not in turns()
+
+
+with ez.test('copy on write survives slices, promotion and discarded copies'):
+    turns = make_turns()
+    copy = ~turns
+    turns.index[:][0] = 99
+    assert list(turns.index) == [0, 1, 0] and list(copy.index) == [0, 1, 0]
+    del copy
+    len(~turns)
+    gc.collect()
+    buffer = turns.index._buffer
+    turns.index[0] = 5
+    assert turns.index._buffer is buffer and turns.index._shared is None
+    turns.index /= 2
+    assert turns.index._buffer.dtype.kind == 'f' and list(turns.index) == [2.5, 0.5, 0.0]
+
+
+with ez.test('semi join, anti join and distinct'):
+    turns = make_turns()
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd3'], domain=['food', 'travel']))
+    kept = turns[turns.dialogue]().semi_join(dialogues.dialogue)
+    assert list(kept.text) == ['hi', 'yo'] and kept().is_view and list(kept().column_names)[:2] == ['text', 'speaker']
+    assert list(turns[turns.dialogue]().anti_join(dialogues.dialogue).text) == ['ok']
+    assert list(turns[turns.index]().semi_join(ez.Table.of(dict(index=[1, 5]))).text) == ['yo']
+    assert list(turns[turns.speaker, turns.index]().anti_join(ez.Table.of(dict(s=['a'], i=[0]))).text) == ['yo']
+    dialogues().add_index('dialogue')
+    assert list(turns[turns.dialogue]().anti_join(dialogues.dialogue).text) == ['ok']
+    assert list(turns().distinct(turns.speaker).text) == ['hi', 'yo']
+    assert list(turns().distinct(turns[turns.speaker, turns.index]).text) == ['hi', 'yo'] and len(turns().distinct()) == 3
+
+
+with ez.test('top k rows'):
+    turns = make_turns()
+    assert list(turns().topk(2, turns.score).text) == ['ok', 'hi'] and list(turns.text) == ['hi', 'yo', 'ok']
+    assert list(turns().topk(2, turns.score, reverse=True).text) == ['yo', 'hi']
+    assert list(turns().topk(2, turns.index, reverse=True).text) == ['yo', 'hi']
+    assert list(turns().topk(5, turns[turns.speaker, turns.text]).text) == ['hi', 'ok', 'yo']
+    assert list(turns().topk(1, lambda text: len(text) - text.count('o')).text) == ['yo']
+    assert ezt.top_rows(['b', 'a', 'b', 'a'], 3, reverse=True) == [0, 2, 1]
+    turns().sort(turns.score, reverse=True, k=1)
+    assert list(turns.text) == ['yo', 'hi', 'ok']
+
+
+with ez.test('top k rows put NaN last'):
+    turns = make_turns() + [dict(text='nan', speaker='c', dialogue='d3', index=3, score=float('nan'), id='n')]
+    turns().sort(turns.id, reverse=True)
+    assert list(turns().topk(1, turns.score, reverse=True).text) == ['yo']
+    assert list(turns().topk(4, turns.score).text) == ['ok', 'hi', 'yo', 'nan']
+    assert list(turns().topk(3, turns.score, reverse=True).text) == ['yo', 'hi', 'ok']
+    assert list(turns().topk(9, turns.score, reverse=True).text) == ['yo', 'hi', 'ok', 'nan']
+    assert ezt.top_rows([0.5, float('nan'), 0.9, 0.1], 2, reverse=True) == [2, 0]
+    turns().sort(turns.score, reverse=True, k=2)
+    assert list(turns.text) == ['yo', 'hi', 'ok', 'nan'] and turns.score[3] != turns.score[3]
+    turns().sort(turns.score, reverse=True)
+    assert list(turns.text) == ['yo', 'hi', 'ok', 'nan']
+
+
+with ez.test('sorts put NaN last without numpy arrays'):
+    nan = float('nan')
+    assert list(ezt.argsort_rows([[0.5, nan, 0.9, 0.1]])) == [3, 0, 2, 1]
+    assert list(ezt.argsort_rows([[0.5, nan, 0.9, 0.1]], reverse=True)) == [2, 0, 3, 1]
+    assert list(ezt.argsort_rows([['b', 'a', 'b', 'a'], [nan, 0.2, 0.1, nan]], reverse=True)) == [2, 0, 1, 3]
+    scores = ez.Table.of(dict(s=list('abcd'), f=ezt.ListColumn([0.5, nan, 0.9, 0.1])))
+    scores().sort(scores.f, reverse=True)
+    assert list(scores.s) == ['c', 'a', 'd', 'b']
+
+
+with ez.test('sort orders are argsorted and cached'):
+    turns = make_turns()
+    assert [int(i) for i in ezt.argsort_rows([['b', 'a', 'b'], [2, 1, 1]])] == [1, 2, 0]
+    assert [int(i) for i in ezt.argsort_rows([[0.5, 0.7, 0.5]], reverse=True)] == [1, 0, 2]
+    order = turns().sort_order(turns[turns.index, turns.speaker])
+    cached = turns().sort_order(turns[turns.index, turns.speaker])
+    assert [int(i) for i in order] == [0, 2, 1] and list(cached) == list(order)
+    assert (cached is order and not order.flags.writeable) if ezt.is_array(order) else cached is not order
+    dialogues = Dialogue.of(dict(dialogue=['d1', 'd1', 'd2'], domain=['x', 'y', 'z']))
+    assert list(dialogues().reorder(order).domain) == ['x', 'z', 'y']
+    turns.index[2] = 2
+    assert turns().sort_order(turns[turns.index, turns.speaker]) is not order
+    turns.index[2] = 0
+    turns().sort(turns.index, reverse=True)
+    assert list(turns.text) == ['yo', 'hi', 'ok'] and turns().sorted_by == []
+    turns().sort(turns[turns.speaker, turns.score])
+    assert list(turns.text) == ['ok', 'hi', 'yo'] and turns().sorted_by == [turns.speaker, turns.score]
+    calls = []
+    turns().sort(lambda text: calls.append(text) or text)
+    assert calls == ['ok', 'hi', 'yo'] and list(turns.text) == ['hi', 'ok', 'yo']